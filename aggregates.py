@@ -0,0 +1,157 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# memoized groupby results shared by all the chart buttons
+# results are keyed by (group column, value column, reducer), so charts asking for the
+# same thing (e.g. genre counts) share one entry; clicking a chart again only redraws
+# the cache is tied to one frame, a new dataset gets a new cache
+
+# keys, value columns and reducers precomputed by warm_up()
+SUMMARY_KEYS = ['genre', 'company', 'country', 'director', 'year']
+SUMMARY_VALUES = ['budget', 'gross', 'score', 'runtime']
+SUMMARY_REDUCERS = ['mean', 'median', 'sum', 'count']
+
+def summarize(data, group, values=SUMMARY_VALUES, reducers=SUMMARY_REDUCERS):
+    # one groupby pass computing every reducer for every value column,
+    # returns (table with (value, reducer) columns, rows per group sorted like value_counts)
+    grouped = data.groupby(group, observed=True)
+    table = grouped[[value for value in values if value in data.columns]].agg(reducers)
+    return table, grouped.size().sort_values(ascending=False)
+
+class AggregateCache:
+    def __init__(self, data, max_entries=64):
+        self._data = data
+        self._max_entries = max_entries
+        self._entries = OrderedDict() # least recently used first
+        self._summaries = {} # group column -> result of summarize(), filled by warm_up()
+
+    @property
+    def data(self):
+        return self._data
+
+    def _lookup(self, key, compute):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        result = compute()
+        self._entries[key] = result
+        if len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        return result
+
+    def get(self, group, value=None, reducer='count'):
+        # value=None counts rows per group (value_counts), otherwise groupby(group)[value].agg(reducer)
+        # the returned series is shared, so callers must not modify it in place
+        summary = self._summaries.get(group)
+        if summary is not None:
+            table, sizes = summary
+            if value is None:
+                return sizes
+            if (value, reducer) in table.columns:
+                return table[(value, reducer)]
+        if value is None:
+            return self._lookup((group, None, 'count'), lambda: self.data[group].value_counts())
+        return self._lookup((group, value, reducer), lambda: self.data.groupby(group, observed=True)[value].agg(reducer))
+
+    def largest(self, column, n):
+        # the n rows with the highest values in column
+        return self._lookup((None, column, ('nlargest', n)), lambda: self.data.nlargest(n, column))
+
+    def warm_up(self, keys=SUMMARY_KEYS):
+        # precomputes the summary table of every key, so chart clicks become lookups
+        for group in keys:
+            if group in self._data.columns:
+                self._summaries[group] = summarize(self._data, group)
+
+    def start_warm_up(self, keys=SUMMARY_KEYS):
+        # runs warm_up() on a background thread so the window can show up right away
+        thread = threading.Thread(target=self.warm_up, args=(keys,), daemon=True)
+        thread.start()
+        return thread
+
+# reducers SelectionAggregates can update by adding and subtracting rows
+INCREMENTAL_REDUCERS = ('sum', 'count', 'mean')
+
+def _partial(frame, group, value):
+    # per-group running totals: sum and count of value, or just row counts when value is None
+    # float sums are kept in float64 (score is a float32 column), a float32 total would drift
+    # further from a fresh groupby with every selection added and subtracted
+    grouped = frame.groupby(group, observed=True)
+    if value is None:
+        return grouped.size().to_frame('count')
+    values = frame[value]
+    if values.dtype.kind == 'f':
+        values = values.astype('float64')
+    return values.groupby(frame[group], observed=True).agg(['sum', 'count'])
+
+class SelectionAggregates(AggregateCache):
+    # aggregates over a subset of the dataset's rows, e.g. what the table's search boxes left
+    # sums, counts and means are kept per group and, when the subset changes, only the rows
+    # that left or entered it are subtracted/added; other reducers (median, nlargest, ...)
+    # are recomputed on the subset the first time they are asked for
+    def __init__(self, data, max_entries=64):
+        super().__init__(data, max_entries)
+        self._base = data
+        self._rows = None # positions into the dataset, None when every row is selected
+        self._totals = {} # (group, value) -> DataFrame of per-group 'sum'/'count'
+
+    @property
+    def data(self):
+        # the selected rows, only sliced out when a reducer actually needs them
+        if self._data is None:
+            self._data = self._base.iloc[self._rows]
+        return self._data
+
+    def set_rows(self, rows):
+        # rows are sorted positions into the dataset (PandasModel.rows), None for all of them
+        # returns False when the selection did not change
+        old = self._rows
+        if rows is old or (rows is not None and old is not None and np.array_equal(rows, old)):
+            return False
+        self._rows = rows
+        self._data = self._base if rows is None else None
+        self._entries.clear()
+        self._summaries = {}
+        if not self._totals:
+            return True # nothing kept to update, e.g. no chart has been drawn from the selection yet
+        every_row = np.arange(len(self._base))
+        old_rows = every_row if old is None else old
+        new_rows = every_row if rows is None else rows
+        removed = np.setdiff1d(old_rows, new_rows, assume_unique=True)
+        added = np.setdiff1d(new_rows, old_rows, assume_unique=True)
+        if len(removed) + len(added) > len(new_rows):
+            # the selection changed more than it contains, regrouping it is cheaper
+            self._totals = {}
+            return True
+        removed, added = self._base.iloc[removed], self._base.iloc[added]
+        for key, totals in self._totals.items():
+            dtypes = totals.dtypes.to_dict() # aligning turns the int64 counts and sums into floats
+            if len(removed):
+                totals = totals.sub(_partial(removed, *key), fill_value=0)
+            if len(added):
+                totals = totals.add(_partial(added, *key), fill_value=0)
+            self._totals[key] = totals.astype(dtypes)
+        return True
+
+    def _group_totals(self, group, value):
+        key = (group, value)
+        if key not in self._totals:
+            self._totals[key] = _partial(self.data, group, value)
+        totals = self._totals[key]
+        return totals[totals['count'] > 0]
+
+    def _from_totals(self, group, value, reducer):
+        totals = self._group_totals(group, value)
+        if value is None:
+            return totals['count'].astype('int64').sort_values(ascending=False)
+        if reducer == 'mean':
+            return totals['sum'] / totals['count']
+        if reducer == 'count':
+            return totals['count'].astype('int64')
+        return totals['sum']
+
+    def get(self, group, value=None, reducer='count'):
+        if value is None or reducer in INCREMENTAL_REDUCERS:
+            return self._lookup((group, value, reducer), lambda: self._from_totals(group, value, reducer))
+        return super().get(group, value, reducer)
@@ -0,0 +1,71 @@
+# the numbers behind every chart, with no Qt or matplotlib involved
+# it imports nothing itself, so the UI can import it before pandas is loaded
+# each function takes an AggregateCache (wrap a plain DataFrame with AggregateCache(frame))
+# and returns compact numpy arrays, usually (labels, values) ordered the way the chart shows them
+# all UI variants and render_charts.py call these, so caching, benchmarking or vectorizing a
+# computation only has to happen here
+
+# columns each chart reads, by the chart's name in the Apps and render_charts.py
+# loader.needed_columns() parses only these plus what the table shows
+CHART_COLUMNS = {
+    'name_vs_gross': ['name', 'gross'],
+    'company_vs_revenue': ['company', 'gross'],
+    'genre_vs_freq': ['genre'],
+    'budget_revenue': ['year', 'budget', 'gross'],
+    'genre_vs_gross': ['genre', 'gross'],
+    'country_vs_revenue': ['country', 'gross'],
+    'country_vs_score': ['country', 'score'],
+    'directors_score': ['director', 'score'],
+    'directors_gross': ['director', 'gross'],
+    'budget_distribution': ['budget'],
+    'runtime_distribution': ['runtime'],
+    'preferred_genres': ['genre'],
+    'rating_popularity': ['rating'],
+}
+
+def _labels_values(series):
+    return series.index.to_numpy(dtype=object), series.to_numpy()
+
+def top_grossing_movies(aggregates, n=15):
+    # names and gross of the n highest grossing movies, highest first
+    top = aggregates.largest('gross', n)
+    return top['name'].to_numpy(dtype=object), top['gross'].to_numpy()
+
+def top_companies_by_gross(aggregates, n=10, reducer='mean'):
+    # production companies with the highest mean (or total) gross, highest first
+    return _labels_values(aggregates.get('company', 'gross', reducer).nlargest(n))
+
+def genre_counts(aggregates, n=None):
+    # movies per genre, most common first
+    counts = aggregates.get('genre').sort_values(ascending=False)
+    return _labels_values(counts if n is None else counts.head(n))
+
+def median_gross_by_genre(aggregates):
+    # median because gross is skewed within a genre
+    return _labels_values(aggregates.get('genre', 'gross', 'median').sort_values(ascending=False))
+
+def top_countries_by_median_gross(aggregates, n=10):
+    return _labels_values(aggregates.get('country', 'gross', 'median').nlargest(n))
+
+def mean_score_by_country(aggregates, n=20):
+    return _labels_values(aggregates.get('country', 'score', 'mean').sort_values(ascending=False).head(n))
+
+def top_directors_by_score(aggregates, n=25):
+    return _labels_values(aggregates.get('director', 'score', 'mean').nlargest(n))
+
+def top_directors_by_gross(aggregates, n=25):
+    return _labels_values(aggregates.get('director', 'gross', 'sum').nlargest(n))
+
+def yearly_budget_gross(aggregates):
+    # years and the mean budget and gross of each year
+    budget = aggregates.get('year', 'budget', 'mean')
+    gross = aggregates.get('year', 'gross', 'mean').reindex(budget.index)
+    return budget.index.to_numpy(), budget.to_numpy(), gross.to_numpy()
+
+def rating_counts(aggregates):
+    # movies per rating, most common first
+    return _labels_values(aggregates.get('rating').sort_values(ascending=False))
+
+def column_values(aggregates, column):
+    # raw values of a numeric column without missing ones, for the histograms
+    return aggregates.data[column].dropna().to_numpy()
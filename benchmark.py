@@ -0,0 +1,208 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen') # no display needed
+import numpy as np
+import pandas as pd
+from PyQt5.QtCore import QCoreApplication, Qt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from loader import CSV_PATH, load_movies
+from aggregates import AggregateCache
+from table_model import PandasModel
+from chart_render import ChartRenderer
+from render_charts import CHARTS
+import analytics
+
+# times the work behind every interaction of the Apps, headless, on copies of movies.csv
+# scaled up 1x to 1000x, and writes the results as JSON; with --baseline the run is compared
+# against an earlier results file and fails when something got slower than the tolerance
+#   python benchmark.py --scales 1 10 --out bench.json
+#   python benchmark.py --scales 1 10 --baseline bench.json
+# every number is the best of --repeat runs, in seconds
+# the table keeps every cell as a string, so 1000x needs several GB of memory
+
+VIEWPORT_ROWS = 40 # rows a maximized table shows at once
+
+# the computation behind each chart, with the arguments render_charts.py uses
+COMPUTATIONS = {
+    'name_vs_gross': lambda aggregates: analytics.top_grossing_movies(aggregates, 15),
+    'company_vs_revenue': lambda aggregates: analytics.top_companies_by_gross(aggregates, 10),
+    'genre_vs_freq': lambda aggregates: analytics.genre_counts(aggregates),
+    'budget_revenue': lambda aggregates: analytics.yearly_budget_gross(aggregates),
+    'genre_vs_gross': lambda aggregates: analytics.median_gross_by_genre(aggregates),
+    'country_vs_revenue': lambda aggregates: analytics.top_countries_by_median_gross(aggregates, 10),
+    'country_vs_score': lambda aggregates: analytics.mean_score_by_country(aggregates, 20),
+    'directors_score': lambda aggregates: analytics.top_directors_by_score(aggregates, 25),
+    'directors_gross': lambda aggregates: analytics.top_directors_by_gross(aggregates, 25),
+    'budget_distribution': lambda aggregates: analytics.column_values(aggregates, 'budget'),
+    'runtime_distribution': lambda aggregates: analytics.column_values(aggregates, 'runtime'),
+    'preferred_genres': lambda aggregates: analytics.genre_counts(aggregates, 15),
+    'rating_popularity': lambda aggregates: analytics.rating_counts(aggregates),
+}
+
+def synthetic_csv(scale, csv_path=CSV_PATH, directory=None):
+    # movies.csv repeated scale times, kept in the temp directory between runs
+    # copies get a numbered name so the loader does not drop them as duplicates
+    csv_path = os.path.expanduser(csv_path)
+    if scale == 1:
+        return csv_path
+    directory = directory or os.path.join(tempfile.gettempdir(), 'movies_benchmark')
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'movies_x{scale}.csv')
+    if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(csv_path):
+        return path
+    source = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+    with open(path + '.tmp', 'w', newline='') as f:
+        for copy in range(scale):
+            chunk = source.copy()
+            if copy:
+                chunk['name'] = chunk['name'].where(chunk['name'] == '', chunk['name'] + f' ({copy})')
+            chunk.to_csv(f, header=copy == 0, index=False)
+    os.replace(path + '.tmp', path)
+    return path
+
+def best_of(repeat, run, setup=None):
+    # best time of repeat calls of run(setup()), setup is not timed
+    times = []
+    for _ in range(repeat):
+        argument = setup() if setup is not None else None
+        start = time.perf_counter()
+        run(argument) if setup is not None else run()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def _filter_query(model, column):
+    # a query matching a fair number of rows: the upper half of a numeric column,
+    # the start of the most common value of any other
+    values = model._original_data.iloc[:, column]
+    if model.is_numeric(column):
+        return f'>={values.median()}'
+    return values.astype(str).value_counts().index[0][:4]
+
+def _clear_sort_caches(model):
+    # forgets every cached sort order and rank, so the next sort starts from scratch
+    model._sort_orders.clear()
+    model._sort_ranks.clear()
+
+def _read_viewport(model):
+    for row in range(min(VIEWPORT_ROWS, model.rowCount())):
+        for column in range(model.columnCount()):
+            model.data(model.index(row, column), Qt.ItemDataRole.DisplayRole)
+
+def _render(name, aggregates):
+    figure = Figure(figsize=(12, 8))
+    canvas = FigureCanvasAgg(figure)
+    CHARTS[name](ChartRenderer(canvas, figure.add_subplot(111)), aggregates)
+    canvas.draw()
+
+def run_scale(scale, repeat=3, csv_path=CSV_PATH):
+    # {benchmark name: seconds} for one dataset size
+    path = synthetic_csv(scale, csv_path)
+    results = {}
+    results['load'] = best_of(repeat, lambda: load_movies(path, use_cache=False))
+    data = load_movies(path) # also writes the cache the next line reads
+    results['load_cached'] = best_of(repeat, lambda: load_movies(path))
+
+    results['model'] = best_of(repeat, lambda: PandasModel(data))
+    model = PandasModel(data)
+    # cold: the first sort by a column, which builds its cached ranks and order
+    # warm: sorting again in alternating directions, served from those caches
+    orders = [Qt.SortOrder.AscendingOrder, Qt.SortOrder.DescendingOrder]
+    for column, name in enumerate(data.columns):
+        results[f'sort/{name}/cold'] = best_of(repeat, lambda _: model.sort(column, orders[0]), lambda: _clear_sort_caches(model))
+        flips = iter(orders * repeat)
+        results[f'sort/{name}/warm'] = best_of(repeat, lambda: model.sort(column, next(flips)))
+    year, gross = data.columns.get_loc('year'), data.columns.get_loc('gross')
+    directions = iter(orders * repeat * 2)
+    def multi_key_sort(_=None):
+        model.sort(year, Qt.SortOrder.AscendingOrder)
+        model.sort(gross, next(directions), append=True)
+    results['sort/year+gross/cold'] = best_of(repeat, multi_key_sort, lambda: _clear_sort_caches(model))
+    results['sort/year+gross/warm'] = best_of(repeat, multi_key_sort)
+    model.sort(0, Qt.SortOrder.AscendingOrder)
+    for column, name in enumerate(data.columns):
+        query = _filter_query(model, column)
+        def clear_filter():
+            model.filter(column, '')
+        results[f'filter/{name}'] = best_of(repeat, lambda _: model.filter(column, query), clear_filter)
+        model.filter(column, '')
+    results['data/viewport'] = best_of(repeat, lambda: _read_viewport(model))
+
+    for name, compute in COMPUTATIONS.items():
+        results[f'compute/{name}'] = best_of(repeat, compute, lambda: AggregateCache(data))
+    aggregates = AggregateCache(data)
+    for name in CHARTS:
+        COMPUTATIONS[name](aggregates) # cached, so only drawing is timed
+        results[f'render/{name}'] = best_of(repeat, lambda: _render(name, aggregates))
+    return results
+
+def run(scales, repeat=3, csv_path=CSV_PATH, log=print):
+    report = {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'repeat': repeat,
+        },
+        'results': {},
+    }
+    for scale in scales:
+        start = time.perf_counter()
+        for name, seconds in run_scale(scale, repeat, csv_path).items():
+            report['results'][f'{scale}x/{name}'] = seconds
+        log(f'{scale:5}x done in {time.perf_counter() - start:.1f} s')
+    return report
+
+def compare(results, baseline, tolerance=0.25, noise_ms=1.0):
+    # (name, baseline seconds, seconds) of the benchmarks that got more than tolerance slower
+    # differences under noise_ms are ignored, timers are not that precise
+    regressions = []
+    for name, seconds in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        if seconds > before * (1 + tolerance) and (seconds - before) * 1000 > noise_ms:
+            regressions.append((name, before, seconds))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Time loading, sorting, filtering and the charts on scaled copies of movies.csv.')
+    parser.add_argument('--csv', default=CSV_PATH, help='path to movies.csv')
+    parser.add_argument('--scales', nargs='+', type=int, default=[1, 10], help='dataset sizes as multiples of movies.csv')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per benchmark, the best one counts')
+    parser.add_argument('--out', default='benchmark.json', help='where to write the results')
+    parser.add_argument('--baseline', help='earlier results file to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown against the baseline, 0.25 is 25%%')
+    parser.add_argument('--noise-ms', type=float, default=1.0, help='slowdowns smaller than this are ignored')
+    args = parser.parse_args(argv)
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    report = run(args.scales, args.repeat, args.csv)
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    width = max(map(len, report['results']))
+    for name, seconds in report['results'].items():
+        print(f'{name:{width}} {seconds * 1000:10.2f} ms')
+    print(f'results written to {args.out}')
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(report['results'], baseline, args.tolerance, args.noise_ms)
+        for name, before, seconds in regressions:
+            print(f'SLOWER {name}: {before * 1000:.2f} ms -> {seconds * 1000:.2f} ms')
+        if regressions:
+            return 1
+        print(f'no regressions against {args.baseline}')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
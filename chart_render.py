@@ -0,0 +1,169 @@
+import numpy as np
+
+# keeps one axes with its own artists per chart instead of clearing and rebuilding
+# the figure on every click
+# showing a chart again (or after the data changed) just moves the existing bars,
+# labels and lines with set_height/set_width/set_text/set_data, hides the other axes
+# and asks the canvas for a draw_idle()
+
+class _BarChart:
+    def __init__(self, ax, horizontal, text_format, text_pad):
+        self.ax = ax
+        self.horizontal = horizontal
+        self.text_format = text_format # value -> annotation string, None for no annotations
+        self.text_pad = text_pad # gap between the end of a bar and its annotation
+        self.bars = None
+        self.texts = []
+
+    def update(self, labels, values, color):
+        values = list(values)
+        positions = np.arange(len(values))
+        if self.bars is None or len(self.bars) != len(values):
+            # number of bars changed, so only this chart's artists are rebuilt
+            if self.bars is not None:
+                self.bars.remove()
+                for text in self.texts:
+                    text.remove()
+            draw = self.ax.barh if self.horizontal else self.ax.bar
+            self.bars = draw(positions, values)
+            if self.text_format is None:
+                self.texts = []
+            elif self.horizontal:
+                self.texts = [self.ax.text(0, 0, '', va='center', color='black') for _ in values]
+            else:
+                self.texts = [self.ax.text(0, 0, '', ha='center', color='black') for _ in values]
+        else:
+            for bar, value in zip(self.bars, values):
+                if self.horizontal:
+                    bar.set_width(value)
+                else:
+                    bar.set_height(value)
+
+        for bar in self.bars:
+            bar.set_color(color)
+        for text, bar, value in zip(self.texts, self.bars, values):
+            if self.horizontal:
+                text.set_position((value + self.text_pad, bar.get_y() + bar.get_height()/2))
+            else:
+                text.set_position((bar.get_x() + bar.get_width()/2, value + self.text_pad))
+            text.set_text(self.text_format(value))
+
+        labels = [str(label) for label in labels]
+        if self.horizontal:
+            self.ax.set_yticks(positions, labels)
+        else:
+            self.ax.set_xticks(positions, labels)
+        self.ax.relim()
+        self.ax.autoscale_view()
+
+class _HistChart:
+    def __init__(self, ax):
+        self.ax = ax
+        self.bars = None
+
+    def update(self, values, color, bins):
+        counts, edges = np.histogram(np.asarray(values, dtype=float), bins=bins)
+        if self.bars is None or len(self.bars) != len(counts):
+            if self.bars is not None:
+                self.bars.remove()
+            self.bars = self.ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', edgecolor='white')
+        else:
+            for bar, left, width, count in zip(self.bars, edges[:-1], np.diff(edges), counts):
+                bar.set_x(left)
+                bar.set_width(width)
+                bar.set_height(count)
+        for bar in self.bars:
+            bar.set_facecolor(color)
+        self.ax.relim()
+        self.ax.autoscale_view()
+
+class _LineChart:
+    def __init__(self, ax):
+        self.ax = ax
+        self.lines = {} # label -> Line2D
+
+    def update(self, series):
+        for label, x, y in series:
+            if label in self.lines:
+                self.lines[label].set_data(x, y)
+            else:
+                self.lines[label], = self.ax.plot(x, y, label=label)
+        self.ax.relim()
+        self.ax.autoscale_view()
+
+class AxesPool:
+    # hands out one axes per view, created on the first request and reused afterwards,
+    # so the figure never grows past one axes per chart no matter how often charts are switched
+    def __init__(self, figure, blank_ax):
+        self._figure = figure
+        self._blank = blank_ax # empty axes shown when no view is selected
+        self._axes = {} # view name -> axes
+
+    def __len__(self):
+        return len(self._axes)
+
+    def get(self, name):
+        if name not in self._axes:
+            self._axes[name] = self._figure.add_axes(self._blank.get_position(), label=name)
+        return self._axes[name]
+
+    def show(self, ax):
+        # only ax stays visible
+        for pooled in self._axes.values():
+            pooled.set_visible(pooled is ax)
+        self._blank.set_visible(ax is self._blank)
+
+class ChartRenderer:
+    def __init__(self, canvas, blank_ax):
+        self._canvas = canvas
+        self._blank = blank_ax # empty axes shown when no chart is selected, also used for messages
+        self._pool = AxesPool(canvas.figure, blank_ax)
+        self._message = None
+        self._charts = {} # chart name -> chart object owning its pooled axes
+
+    def _chart(self, name, factory):
+        # returns the chart's persistent artists, creating them the first time
+        if name not in self._charts:
+            self._charts[name] = factory(self._pool.get(name))
+        chart = self._charts[name]
+        self._show(chart.ax)
+        return chart
+
+    def _show(self, ax):
+        self._pool.show(ax)
+        if self._message is not None:
+            self._message.set_visible(False)
+
+    def bar(self, name, labels, values, color, horizontal=False, text_format=None, text_pad=0):
+        chart = self._chart(name, lambda ax: _BarChart(ax, horizontal, text_format, text_pad))
+        chart.update(labels, values, color)
+        return chart.ax
+
+    def hist(self, name, values, color, bins=30):
+        chart = self._chart(name, _HistChart)
+        chart.update(values, color, bins)
+        return chart.ax
+
+    def lines(self, name, series):
+        # series is a list of (label, x, y)
+        chart = self._chart(name, _LineChart)
+        chart.update(series)
+        return chart.ax
+
+    def message(self, text):
+        # shows a centered note on the blank axes
+        self._show(self._blank)
+        if self._message is None:
+            self._message = self._blank.text(0.5, 0.5, '', horizontalalignment='center', verticalalignment='center', color='black')
+        self._message.set_text(text)
+        self._message.set_visible(True)
+        return self._blank
+
+    def clear(self):
+        # back to the empty axes
+        self._show(self._blank)
+        self.draw()
+        return self._blank
+
+    def draw(self):
+        self._canvas.draw_idle()
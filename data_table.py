@@ -0,0 +1,70 @@
+from PyQt5.QtWidgets import QLineEdit, QLabel, QHeaderView
+from PyQt5.QtCore import Qt, QObject, QEvent
+from filter_worker import FilterController
+
+# the table of movies with its search boxes, built once per dataset and reused every time
+# the App switches back to it, so the model, the queries typed and the sort order survive
+# switching to a chart and back
+# the header and search boxes are connected once here; the Apps used to reconnect them
+# on every "View DataFrame" click, which sorted the data once per earlier click
+# clicking a header sorts by that column, shift-clicking more headers adds them as
+# secondary keys (shift-clicking one of them again flips its direction)
+# a model that can neither sort nor filter (table_model.StoreModel) gets no search boxes
+# and its header does not react to clicks
+
+class DataTable(QObject):
+    def __init__(self, table_view, search_layout, model, parent=None):
+        super().__init__(parent)
+        self.table_view = table_view
+        self.model = model
+        self.searchable = hasattr(model, 'build_view')
+        self.search_boxes = []
+        if not self.searchable:
+            return
+        self.filter_controller = FilterController(model, parent=self) # filters off the GUI thread
+
+        # sorting
+        header = table_view.horizontalHeader()
+        header.sortIndicatorChanged.connect(self.handle_column_click)
+        self._shift_click = False # whether the header click being handled was a shift-click
+        header.viewport().installEventFilter(self)
+
+        # one search box per column
+        for i in range(model.columnCount()):
+            title = model.headerData(i, Qt.Horizontal, Qt.ItemDataRole.DisplayRole)
+            search_box = QLineEdit()
+            search_box.setPlaceholderText(f"Search {title}" + (" (>1e8, 2000..2010)" if model.is_numeric(i) else ""))
+            search_box.textChanged.connect(lambda text, col=i: self.handle_search(text, col))
+            self.search_boxes.append(search_box)
+            search_layout.addWidget(QLabel(title))
+            search_layout.addWidget(search_box)
+
+    def show(self):
+        # puts the model back in the table view, nothing is rebuilt
+        if self.table_view.model() is not self.model:
+            self.table_view.setModel(self.model)
+        header = self.table_view.horizontalHeader()
+        header.setSortIndicatorShown(self.searchable)
+        header.setSectionResizeMode(QHeaderView.Stretch) # stretch columns to fit the table width
+
+    def eventFilter(self, watched, event):
+        # the header sorts on mouse release, remember the modifiers of that click for handle_column_click()
+        if event.type() in (QEvent.MouseButtonPress, QEvent.MouseButtonRelease):
+            self._shift_click = bool(event.modifiers() & Qt.ShiftModifier)
+        return False
+
+    def handle_column_click(self, index, order):
+        # sort model based on the clicked column, shift-click adds it as a secondary key
+        self.model.sort(index, order, append=self._shift_click)
+        # a shift-click on a key flips it in the model whatever the header's arrow said,
+        # so the arrow is set to match, otherwise the next click would ask for the same order again
+        order = self.model.sort_order(index)
+        header = self.table_view.horizontalHeader()
+        if order is not None and (header.sortIndicatorSection() != index or header.sortIndicatorOrder() != order):
+            header.blockSignals(True)
+            header.setSortIndicator(index, order)
+            header.blockSignals(False)
+
+    def handle_search(self, text, column):
+        # apply filter based on the search box
+        self.filter_controller.set_query(column, text)
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+# duplicate removal that works chunk by chunk, e.g. while a csv is streamed in
+# instead of keeping earlier rows around to compare against, every row is reduced to a
+# 64-bit hash and only the hashes are kept, 8 bytes per distinct row
+# two different rows sharing a hash is possible in theory (about n^2 / 2^65 for n rows),
+# so for a few million rows it does not happen in practice
+
+def row_hashes(frame):
+    # one uint64 per row, from the values only (not the index)
+    # numbers are hashed as float64, so a row hashes the same whether its chunk came out
+    # as ints or as floats (one missing value turns a whole chunk's column into floats)
+    numeric = frame.select_dtypes('number').columns
+    normalized = frame.astype({name: 'float64' for name in numeric}) if len(numeric) else frame
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+
+class RowDeduplicator:
+    def __init__(self):
+        # sorted arrays of the hashes seen so far, each at most half the size of the one before it,
+        # so adding a chunk merges into a few small arrays and a lookup is one searchsorted per array
+        self._runs = []
+        self.dropped = 0 # duplicate rows found so far
+
+    def __len__(self):
+        # distinct rows seen so far
+        return sum(len(run) for run in self._runs)
+
+    def _contains(self, hashes):
+        # looked up in sorted order, which keeps searchsorted's walk through a big run cache friendly
+        order = np.argsort(hashes)
+        wanted = hashes[order]
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self._runs:
+            positions = np.minimum(np.searchsorted(run, wanted), len(run) - 1)
+            found[order] |= run[positions] == wanted
+        return found
+
+    def _add(self, hashes):
+        run = np.sort(hashes)
+        if not len(run):
+            return
+        while self._runs and len(self._runs[-1]) <= len(run):
+            run = np.sort(np.concatenate([self._runs.pop(), run]), kind='stable') # merging two sorted runs
+        self._runs.append(run)
+
+    def duplicated(self, frame):
+        # boolean mask of the rows in frame that appeared before, in this frame or an earlier one
+        # (the first occurrence is kept, like DataFrame.drop_duplicates)
+        hashes = row_hashes(frame)
+        mask = pd.Series(hashes).duplicated().to_numpy()
+        if self._runs:
+            mask = mask | self._contains(hashes)
+        self._add(hashes[~mask])
+        self.dropped += int(mask.sum())
+        return mask
@@ -1,65 +1,22 @@
 import textwrap
 import sys
-import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from PyQt5.QtWidgets import QApplication, QMainWindow, QStackedLayout, QVBoxLayout, QWidget, QPushButton, QTableView, QHBoxLayout, QLineEdit, QLabel, QHeaderView, QStackedWidget
-from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt5.QtWidgets import QApplication, QStackedLayout, QVBoxLayout, QWidget, QPushButton, QTableView, QHBoxLayout, QStackedWidget
 from PyQt5.QtGui import QFont
-import random
+from movies_window import MoviesWindow
+import analytics
 
-data = pd.read_csv('~/movies_analysis/movies.csv')
-data.drop_duplicates(inplace=True)
-data.dropna(inplace=True)
+table_columns = ['name', 'rating', 'genre', 'year', 'score', 'director', 'star', 'country', 'budget', 'gross', 'company', 'runtime'] # shown in the table, together with the chart columns these are all that is read from the csv
 
-data.drop(['votes', 'released', 'writer'], axis=1, inplace=True)
+def load_data(on_chunk):
+    # runs on the loader thread so the window is up before pandas and the csv are, nothing in here may touch a widget
+    # on_chunk(rows, progress) passes every parsed chunk on to the table while the rest is still being read
+    from loader import load_dataset, needed_columns
+    return load_dataset(on_chunk=on_chunk, columns=needed_columns(table_columns)) # drops duplicates and missing values, cached as a binary file after the first run (a big csv is kept on disk instead, see loader.STORE_BYTES)
 #list of colors
 colors = ['lightcoral', 'indianred','maroon', 'red', 'saddlebrown', 'peru', 'darkorange', 'tan','gold','plum','tomato','forestgreen','darkgreen','green','lime','seagreen','mediumspringgreen','mediumaquamarine','turquoise', 'darkslategrey','teal','dodgerblue','deepskyblue','cornflowerblue','navy','indigo','blue','mediumslateblue','darkviolet','fuchsia','deeppink','magenta','crimson']
 
-#model for displaying df
-class PandasModel(QAbstractTableModel):
-    def __init__(self, data_frame=pd.DataFrame()):
-        super().__init__()
-        self._original_data = data_frame
-        self._data = data_frame
-
-    def rowCount(self, parent=QModelIndex()):
-        return len(self._data)
-
-    def columnCount(self, parent=QModelIndex()):
-        return len(self._data.columns)
-
-    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
-        if role == Qt.ItemDataRole.DisplayRole:
-            return str(self._data.iloc[index.row(), index.column()])
-        return None
-
-    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
-        if role == Qt.ItemDataRole.DisplayRole:
-            if orientation == Qt.Horizontal:
-                return self._data.columns[section]
-            else:
-                return str(self._data.index[section])
-        return None
-
-    def sort(self, column, order):
-        self.layoutAboutToBeChanged.emit()
-        column_name = self._data.columns[column]
-        self._data = self._data.sort_values(by=column_name, ascending=(order == Qt.SortOrder.AscendingOrder))
-        self.layoutChanged.emit()
-
-    def filter(self, column, query):
-        self.layoutAboutToBeChanged.emit()
-        if query:
-            mask = self._original_data.iloc[:, column].astype(str).str.contains(query, case=False, na=False)
-            self._data = self._original_data[mask]
-        else:
-            self._data = self._original_data
-        self.layoutChanged.emit()
-
 # main application
-class App(QMainWindow):
+class App(MoviesWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Movies Analysis")
@@ -85,9 +42,7 @@ class App(QMainWindow):
 # Create the plot view
         self.plot_view = QWidget()
         self.plot_layout = QVBoxLayout(self.plot_view)
-        self.canvas = FigureCanvas(plt.figure())
-        self.plot_layout.addWidget(self.canvas)
-        self.stacked_widget.addWidget(self.plot_view)
+        self.stacked_widget.addWidget(self.plot_view) # its canvas is added by build_charts()
 
 # creating a horizontal layout for buttons
         self.button_layout = QHBoxLayout()
@@ -114,11 +69,20 @@ class App(QMainWindow):
         }
 
         # creating buttons and adding to layout
+        self.buttons = [] # disabled until the data is loaded
         for text, action in button_actions.items():
             wrap_text = textwrap.fill(text, width=10)  # Adjust width as needed
             button = QPushButton(wrap_text)
             button.clicked.connect(action)
             self.button_layout.addWidget(button)
+            self.buttons.append(button)
+        self.selection_button = QPushButton("Chart Selection") # charts follow the table's search boxes while checked
+        self.selection_button.setCheckable(True)
+        self.selection_button.toggled.connect(self.chart_selection)
+        self.button_layout.addWidget(self.selection_button)
+        self.buttons.append(self.selection_button)
+        for button in self.buttons:
+            button.setEnabled(False)
 
 #        # Create stacked widget for switching views
 #        self.stacked_widget = QStackedWidget()
@@ -130,274 +94,203 @@ class App(QMainWindow):
         self.search_layout = QHBoxLayout()
         self.layout.addLayout(self.search_layout)
 
-        self.search_boxes = []
-        self.model = None
-
-        # create a matplotlib figure and canvas
-        self.figure, self.ax = plt.subplots()
-        self.canvas = FigureCanvas(self.figure)
 
         self.central_widget.setLayout(self.layout)
         self.button_layout.setSpacing(10)
         self.button_layout.setContentsMargins(10, 10, 10, 10)
         self.layout.setContentsMargins(10, 10, 10, 10)
-        # initially show the DataFrame
-        self.view_dataframe()
+        self.start_loading(load_data) # the table and charts are built once the csv is loaded
+
+    def add_canvas(self, canvas):
+        # the plot view shows a blank canvas of its own, the charts draw on the one passed in
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+        self.plot_layout.addWidget(FigureCanvas(Figure()))
 
     def view_dataframe(self):
         # clear previous plot- leads to unknown bugs otherwise
 #        self.ax.clear()
 #        self.canvas.draw()
 
-        # show DataFrame
-        self.model = PandasModel(data)
-        self.table_view.setModel(self.model)
-
-        # sorting
-        header = self.table_view.horizontalHeader()
-        header.setSortIndicatorShown(True)
-        header.sortIndicatorChanged.connect(self.handle_column_click)
-
-        # clear previous search boxes
-        self.clear_search_boxes()
-
-        # adding search boxes
-        for i in range(self.model.columnCount()):
-            search_box = QLineEdit()
-            search_box.setPlaceholderText(f"Search {self.model.headerData(i, Qt.Horizontal, Qt.ItemDataRole.DisplayRole)}")
-            search_box.textChanged.connect(lambda text, col=i: self.handle_search(text, col))
-            self.search_boxes.append(search_box)
-            self.search_layout.addWidget(QLabel(self.model.headerData(i, Qt.Horizontal, Qt.ItemDataRole.DisplayRole)))
-            self.search_layout.addWidget(search_box)
-
-        header.setSectionResizeMode(QHeaderView.Stretch)  # stretch columns to fit the table width
+        # show DataFrame, with the search queries and sort order it had before
+        self.data_table.show()
 
         # update the header
         self.table_view.update()
         self.table_view.viewport().update()
         self.table_view.horizontalHeader().update()
 
-    def clear_search_boxes(self):
-        # remove existing search boxes and labels
-        for box in self.search_boxes:
-            box.deleteLater()
-        self.search_boxes.clear()
-
-        # clear layout items
-        while self.search_layout.count():
-            item = self.search_layout.takeAt(0)
-            widget = item.widget()
-            if widget:
-                widget.deleteLater()
-
-    def handle_column_click(self, index, order):
-        # sort model based on the clicked column
-        self.model.sort(index, order)
-
-    def handle_search(self, text, column):
-        # apply filter based on the search box
-        self.model.filter(column, text)
-
-    def missing_columns(self):
-        self.ax.text(0.5, 0.5, 'Missing required columns. Sorry.', horizontalalignment='center', verticalalignment='center', color='black')
-
     def name_vs_gross(self):
-        self.ax.clear()
-        if 'gross' in data.columns:
-            highest_grossing_movies = data.sort_values(by='gross', ascending=False).head(10)
-            names = highest_grossing_movies['name']
+        self.current_chart = self.name_vs_gross
+        if 'gross' in self.data.columns:
+            names, gross = analytics.top_grossing_movies(self.aggregates, 10)
             wrap_names = [textwrap.fill(name, width=20) for name in names]  # Adjust width as needed
-            gross = highest_grossing_movies['gross']
-            bars = self.ax.barh(wrap_names, gross, color=random.choice(colors))
-            for bar in bars:
-                width = bar.get_width()
-                self.ax.text(width + 1e7, bar.get_y() + bar.get_height()/2, f'${width/1e9:.1f}B', va='center', color='black')
+            self.ax = self.charts.bar('name_vs_gross', wrap_names, gross, self.chart_color(colors), horizontal=True, text_format=lambda width: f'${width/1e9:.1f}B', text_pad=1e7)
             
             self.ax.set_title('10 Highest Grossing Movies', color='black')
             self.ax.set_xlabel('Gross Revenue (Billions)', color='black')
             self.ax.set_ylabel('Movie Name', color='black')
         else:
             self.missing_columns()
-        self.canvas.draw()
+        self.charts.draw()
 
     def company_vs_revenue(self):
-        self.ax.clear()
-        if 'company' in data.columns and 'gross' in data.columns:
-            # get the top 10 production companies based on mean gross revenue
-            top_10_companies = data.groupby('company')['gross'].mean().nlargest(10).index
-            # filtering the data to include only the top 15 companies
-            data_top_10 = data[data['company'].isin(top_10_companies)]
-            # sort the data by mean gross revenue in descending order
-            data_top_10_sorted = data_top_10.groupby('company')['gross'].mean().reset_index().sort_values(by='gross', ascending=False)
-    
-            company = data_top_10_sorted['company']
-            gross = data_top_10_sorted['gross']
+        self.current_chart = self.company_vs_revenue
+        if 'company' in self.data.columns and 'gross' in self.data.columns:
+            # get the top 10 production companies based on mean gross revenue, highest first
+            company, gross = analytics.top_companies_by_gross(self.aggregates, 10)
             wrap_company = [textwrap.fill(name, width=20) for name in company]  # Adjust width as needed
-            bars = self.ax.barh(wrap_company, gross, color=random.choice(colors))
-            for bar in bars:
-                 width = bar.get_width()
-                 self.ax.text(width + 1e7, bar.get_y() + bar.get_height()/2, f'${width/1e9:.1f}B', va='center', color='black')
+            self.ax = self.charts.bar('company_vs_revenue', wrap_company, gross, self.chart_color(colors), horizontal=True, text_format=lambda width: f'${width/1e9:.1f}B', text_pad=1e7)
     
             self.ax.set_title('Top 10 Production Companies by Revenue', color='black')
             self.ax.set_ylabel('Production Company', color='black')
             self.ax.set_xlabel('Total Revenue(in Billions)', color='black')
         else:
             self.missing_columns()
-        self.canvas.draw()
+        self.charts.draw()
 
     def genre_vs_freq(self):
-        self.ax.clear()
-        if 'genre' in data.columns:
-            genre_counts = data['genre'].value_counts().sort_values(ascending=False)
-            self.ax.bar(genre_counts.index, genre_counts.values, color=random.choice(colors))
+        self.current_chart = self.genre_vs_freq
+        if 'genre' in self.data.columns:
+            genres, counts = analytics.genre_counts(self.aggregates)
+            self.ax = self.charts.bar('genre_vs_freq', genres, counts, self.chart_color(colors))
             self.ax.set_title('Genres Popularity', color='black')
             self.ax.set_xlabel('Genre', color='black')
             self.ax.set_ylabel('Count', color='black')
         else:
             self.missing_columns()
-        self.canvas.draw()
+        self.charts.draw()
 
     def genre_vs_gross(self):
-        self.ax.clear()
-        if 'genre' in data.columns and 'gross' in data.columns:
+        self.current_chart = self.genre_vs_gross
+        if 'genre' in self.data.columns and 'gross' in self.data.columns:
         # we use median bc data might be skewed
-            median_gross_by_genre = data.groupby('genre')['gross'].median().sort_values(ascending=False)
-            self.ax.bar(median_gross_by_genre.index, median_gross_by_genre.values, color=random.choice(colors))
+            genres, gross = analytics.median_gross_by_genre(self.aggregates)
+            self.ax = self.charts.bar('genre_vs_gross', genres, gross, self.chart_color(colors))
             self.ax.set_title('Mean Gross by Genre')
             self.ax.set_xlabel('Genre')
             self.ax.set_ylabel('Gross')
         else:
             self.missing_columns()
-        self.canvas.draw()
+        self.charts.draw()
 
     def country_vs_revenue(self):
-        self.ax.clear()
-        if 'country' in data.columns and 'gross' in data.columns:
+        self.current_chart = self.country_vs_revenue
+        if 'country' in self.data.columns and 'gross' in self.data.columns:
             # similar to top companies vs revenueindex
             # we use median because data wrt country might be skewed
-            top_10_countries = data.groupby('country')['gross'].median().nlargest(10).index
-            data_top_10_countries = data[data['country'].isin(top_10_countries)].sort_values(ascending=False, by='gross')
-            self.ax.bar(data_top_10_countries.country, data_top_10_countries.gross, color=random.choice(colors))
+            countries, gross = analytics.top_countries_by_median_gross(self.aggregates, 10)
+            self.ax = self.charts.bar('country_vs_revenue', countries, gross, self.chart_color(colors))
             self.ax.set_title('Median Gross Revenue by Country (Top 10 Countries)')
             self.ax.set_xlabel('Country', color = 'black')
             self.ax.set_ylabel('Median Gross Revenue', color = 'black')
         else:
              self.missing_columns()
-        self.canvas.draw()
+        self.charts.draw()
 
 
     def country_vs_score(self):
-        self.ax.clear()
-        if 'country' in data.columns and 'score' in data.columns:
-            avg_rating_by_country = data.groupby('country')['score'].mean().sort_values(ascending=False).head(20)
-            self.ax.barh(avg_rating_by_country.index, avg_rating_by_country.values,  color=random.choice(colors))
-            for index, value in enumerate(avg_rating_by_country.values):
-                self.ax.text(value + 0.01, index, f'{value:.2f}', va='center')
+        self.current_chart = self.country_vs_score
+        if 'country' in self.data.columns and 'score' in self.data.columns:
+            countries, scores = analytics.mean_score_by_country(self.aggregates, 20)
+            self.ax = self.charts.bar('country_vs_score', countries, scores, self.chart_color(colors), horizontal=True, text_format=lambda value: f'{value:.2f}', text_pad=0.01)
             self.ax.set_title('Avg Ratings by Country', color = 'black')
             self.ax.set_xlabel('Country', color = 'black')
             self.ax.set_ylabel('Ratings', color = 'black')
             
         else:
             self.missing_columns()
-        self.canvas.draw()
+        self.charts.draw()
 
 
     def directors_score(self):
+        self.current_chart = self.directors_score
         # directors by score
-        self.ax.clear()
-        if 'director' in data.columns and 'score' in data.columns:
-            directors = data.groupby('director')['score'].mean().nlargest(25)
-            bars = self.ax.barh(directors.index, directors.values,  color=random.choice(colors))
-            for bar in bars:
-                height = bar.get_height()
-                width = bar.get_width()
-                self.ax.text(width + 0.01, bar.get_y() + bar.get_height()/2, f'{width:.2f}', va='center', color='black')
+        if 'director' in self.data.columns and 'score' in self.data.columns:
+            directors, scores = analytics.top_directors_by_score(self.aggregates, 25)
+            self.ax = self.charts.bar('directors_score', directors, scores, self.chart_color(colors), horizontal=True, text_format=lambda width: f'{width:.2f}', text_pad=0.01)
             self.ax.set_title('Directors by Score', color='black')
             self.ax.set_xlabel('Director', color='black')
             self.ax.set_ylabel('Average Score', color='black')
         else:
             self.missing_columns()
-        self.canvas.draw()
+        self.charts.draw()
 
     def directors_gross(self):
+        self.current_chart = self.directors_gross
         # directors vs gross
-        self.ax.clear()
-        if 'director' in data.columns and 'gross' in data.columns:
-            director_gross = data.groupby('director')['gross'].sum().nlargest(25)
-            self.ax.barh(director_gross.index, director_gross.values,  color=random.choice(colors))
+        if 'director' in self.data.columns and 'gross' in self.data.columns:
+            directors, gross = analytics.top_directors_by_gross(self.aggregates, 25)
+            self.ax = self.charts.bar('directors_gross', directors, gross, self.chart_color(colors), horizontal=True)
             self.ax.set_title('Directors by Gross Revenue', color='black')
             self.ax.set_ylabel('Director', color='black')
             self.ax.set_xlabel('Total Gross', color='black')
         else:
             self.missing_columns()
-        self.canvas.draw()
+        self.charts.draw()
 
     def budget_distribution(self):
+        self.current_chart = self.budget_distribution
         # budget distribution
-        self.ax.clear()
-        if 'budget' in data.columns:
-            self.ax.hist(data['budget'], bins=30,  color=random.choice(colors), edgecolor='white')
+        if 'budget' in self.data.columns:
+            self.ax = self.charts.hist('budget_distribution', analytics.column_values(self.aggregates, 'budget'), self.chart_color(colors), bins=30)
             self.ax.set_title('Budget Distribution', color='black')
             self.ax.set_xlabel('Budget', color='black')
             self.ax.set_ylabel('Frequency', color='black')
             self.ax.grid(axis='y', linestyle=':', alpha=0.7)
         else:
             self.missing_columns()
-        self.canvas.draw()
+        self.charts.draw()
 
     def runtime_distribution(self):
+        self.current_chart = self.runtime_distribution
         # plot of runtime distribution
-        self.ax.clear()
-        if 'runtime' in data.columns:
-            self.ax.hist(data['runtime'].dropna(), bins=30,  color=random.choice(colors), edgecolor='white')
+        if 'runtime' in self.data.columns:
+            self.ax = self.charts.hist('runtime_distribution', analytics.column_values(self.aggregates, 'runtime'), self.chart_color(colors), bins=30)
             self.ax.set_title('Runtime Distribution', color='black')
             self.ax.set_xlabel('Runtime (minutes)', color='black')
             self.ax.set_ylabel('Frequency', color='black')
         else:
             self.missing_columns()
-        self.canvas.draw()
+        self.charts.draw()
 
     def budget_revenue(self):
-        self.ax.clear()
-        if 'budget' in data.columns and 'gross' in data.columns:
-            data_mean = data.groupby('year').agg({'budget': 'mean', 'gross': 'mean'}).reset_index()
-            self.ax.plot(data_mean['year'], data_mean['budget'],label = 'budget')
-            self.ax.plot(data_mean['year'], data_mean['gross'], label = 'gross')
+        self.current_chart = self.budget_revenue
+        if 'budget' in self.data.columns and 'gross' in self.data.columns:
+            years, budget, gross = analytics.yearly_budget_gross(self.aggregates)
+            self.ax = self.charts.lines('budget_revenue', [('budget', years, budget), ('gross', years, gross)])
             self.ax.set_title('Budget and Revenue Correlation through the years')
             self.ax.set_xlabel('Years')
             self.ax.set_ylabel('Money')
             self.ax.legend()
         else:
             self.missing_columns()
-        self.canvas.draw()
+        self.charts.draw()
 
     def preferred_genres(self):
+        self.current_chart = self.preferred_genres
         # plot of preferred genres
-        self.ax.clear()
-        if 'genre' in data.columns:
-            preferred_genre = data['genre'].value_counts().nlargest(15)
-            bars = self.ax.bar(preferred_genre.index, preferred_genre.values, color=random.choice(colors))
-            for bar in bars:
-                height = bar.get_height()
-                self.ax.text(bar.get_x() + bar.get_width()/2, height + 15, str(height), ha='center', color='black')
+        if 'genre' in self.data.columns:
+            genres, counts = analytics.genre_counts(self.aggregates, 15)
+            self.ax = self.charts.bar('preferred_genres', genres, counts, self.chart_color(colors), text_format=str, text_pad=15)
             self.ax.set_title('Preferred Genres', color='black')
             self.ax.set_xlabel('Genre', color='black')
             self.ax.set_ylabel('Count', color='black')
         else:
             self.missing_columns()
-        self.canvas.draw()
+        self.charts.draw()
 
     def rating_popularity(self):
-        self.ax.clear()
-        if 'rating' in data.columns:
-            rating_counts = data['rating'].value_counts().sort_values(ascending=False)
-            self.ax.bar(rating_counts.index, rating_counts.values, color = random.choice(colors))
+        self.current_chart = self.rating_popularity
+        if 'rating' in self.data.columns:
+            ratings, counts = analytics.rating_counts(self.aggregates)
+            self.ax = self.charts.bar('rating_popularity', ratings, counts, self.chart_color(colors))
             self.ax.set_xlabel('Rating')
             self.ax.set_ylabel('Count')
             self.ax.set_title('Rating Distribution')
         else:
             self.missing_columns()
-        self.canvas.draw()
+        self.charts.draw()
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -0,0 +1,67 @@
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+# runs the search box filters off the GUI thread
+# keystrokes are debounced, at most one filter runs at a time, and a result that was
+# overtaken by newer typing is dropped instead of being shown
+
+class _FilterSignals(QObject):
+    finished = pyqtSignal(object, object) # (filters, view from PandasModel.build_view)
+
+class _FilterJob(QRunnable):
+    def __init__(self, model, filters):
+        super().__init__()
+        self.setAutoDelete(False) # the controller keeps the job alive until it reports back
+        self.signals = _FilterSignals()
+        self._model = model
+        self._filters = filters
+        # snapshot of what the table shows now, so a narrowing query can start from it
+        self._base_filters = model.filters
+        self._base_rows = model.rows
+        self._sort_key = model.sort_key
+
+    def run(self):
+        view = self._model.build_view(self._filters, self._base_filters, self._base_rows, self._sort_key)
+        self.signals.finished.emit(self._filters, view)
+
+class FilterController(QObject):
+    def __init__(self, model, delay=150, parent=None):
+        super().__init__(parent)
+        self._model = model
+        self._wanted = model.filters # queries typed so far, may be ahead of the model
+        self._job = None # filter currently running, if any
+        self._stale = False # set when the queries changed while a job was running
+
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+
+        # waits for a pause in typing before filtering
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay)
+        self._timer.timeout.connect(self._start)
+
+    def set_query(self, column, query):
+        # called for every keystroke in a search box
+        if query:
+            self._wanted[column] = query
+        else:
+            self._wanted.pop(column, None)
+        self._timer.start()
+
+    def _start(self):
+        if self._job is not None:
+            # let the running job finish, then run the newest queries
+            self._stale = True
+            return
+        self._job = _FilterJob(self._model, dict(self._wanted))
+        self._job.signals.finished.connect(self._finished)
+        self._pool.start(self._job)
+
+    def _finished(self, filters, view):
+        self._job = None
+        if self._stale:
+            # the user kept typing, so this result is already out of date
+            self._stale = False
+            self._start()
+            return
+        self._model.set_view(filters, view)
@@ -0,0 +1,64 @@
+import argparse
+import os
+import subprocess
+import sys
+
+# checks how long importing each App variant takes, i.e. the work done before its window can appear
+# every variant runs in a fresh interpreter with -X importtime and fails the check when it
+# goes over the budget or pulls in a module that startup.py is supposed to load in the background
+#   python import_budget.py                  # all variants, default budget
+#   python import_budget.py movies --budget-ms 80 --top 15
+
+VARIANTS = ['movies', 'movies_colored', 'movies_uncolored', 'full_page', 'fcopy']
+BUDGET_MS = 150 # about 50 ms on a warm cache at the time of writing, the rest is headroom for cold disks
+DEFERRED_MODULES = ['pandas', 'numpy', 'matplotlib'] # must not be imported before the window shows
+
+def parse_importtime(stderr):
+    # -X importtime writes "import time: self [us] | cumulative | imported package" lines,
+    # returns {module: (self us, cumulative us)}
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+def measure(module):
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)), env=env)
+    if result.returncode != 0:
+        raise RuntimeError(f'importing {module} failed:\n{result.stderr}')
+    return parse_importtime(result.stderr)
+
+def check(module, budget_ms=BUDGET_MS, top=10):
+    # prints the report for one variant and returns the problems found
+    times = measure(module)
+    total_ms = times[module][1] / 1000
+    problems = []
+    if total_ms > budget_ms:
+        problems.append(f'{module}: import took {total_ms:.1f} ms, budget is {budget_ms} ms')
+    for name in DEFERRED_MODULES:
+        if name in times:
+            problems.append(f'{module}: imports {name} at load time')
+    print(f'{module:18} {total_ms:8.1f} ms')
+    for name, (self_us, _) in sorted(times.items(), key=lambda item: -item[1][0])[:top]:
+        print(f'    {self_us / 1000:8.1f} ms  {name}')
+    return problems
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check the import time of the App variants against a budget.')
+    parser.add_argument('modules', nargs='*', default=VARIANTS, help='modules to import (default: every variant)')
+    parser.add_argument('--budget-ms', type=float, default=BUDGET_MS, help='allowed import time per module')
+    parser.add_argument('--top', type=int, default=5, help='slowest imports to list per module')
+    args = parser.parse_args(argv)
+
+    problems = []
+    for module in args.modules:
+        problems += check(module, args.budget_ms, args.top)
+    for problem in problems:
+        print('FAIL', problem)
+    return 1 if problems else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
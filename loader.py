@@ -0,0 +1,184 @@
+import hashlib
+import importlib.util
+import os
+import pickle
+import pandas as pd
+from schema import apply_schema, invalid_rows, narrow_numbers, read_dtypes
+from analytics import CHART_COLUMNS
+from dedupe import RowDeduplicator
+
+# loads movies.csv and cleans it up the same way for every App variant
+# the csv is parsed in chunks, so callers can show rows and progress long before the whole
+# file is in and the parser never holds more than one chunk of raw text
+# only the columns a caller needs are parsed (see needed_columns()), the rest of the csv is skipped,
+# and the ones that are come in with the dtypes declared in schema.py instead of guessed ones
+# the cleaned frame is pickled next to the csv, so later launches read one binary file
+# instead of parsing and cleaning the csv again
+
+CSV_PATH = '~/movies_analysis/movies.csv'
+CACHE_VERSION = 4 # bump when the cleaning steps or schema change so old caches are rebuilt
+CHUNK_SIZE = 20_000 # rows parsed at a time
+FIRST_CHUNK_SIZE = 500 # small first chunk so a table has something to show almost at once
+# 'pyarrow' parses on several threads and is a lot faster on big files, but reads the file in
+# one piece (no rows before it is done); only used when pyarrow is installed
+CSV_ENGINE = 'c'
+# csvs bigger than this are opened as a mmap_store.ColumnStore by load_dataset(), a DataFrame
+# of them plus the table's strings for every cell would not fit in memory
+STORE_BYTES = 512 * 2**20
+
+def clean(frame, deduplicator=None):
+    # with a RowDeduplicator, rows already seen in earlier chunks count as duplicates too
+    if deduplicator is None:
+        frame.drop_duplicates(inplace=True) # removes any duplicate rows
+    else:
+        frame.drop(frame.index[deduplicator.duplicated(frame)], inplace=True)
+    frame.dropna(inplace=True) # removes rows with missing values
+    return frame
+
+def needed_columns(table_columns=(), charts=CHART_COLUMNS):
+    # the columns a window has to load: what its table shows plus what its charts read
+    columns = list(table_columns)
+    for chart_columns in charts.values():
+        columns += [name for name in chart_columns if name not in columns]
+    return columns
+
+def cache_path(csv_path, columns=None):
+    # one cache per column selection, so windows loading different columns do not evict each other
+    if columns is None:
+        return csv_path + '.cache.pkl'
+    digest = hashlib.sha1(','.join(sorted(columns)).encode()).hexdigest()[:10]
+    return f'{csv_path}.{digest}.cache.pkl'
+
+def source_stamp(csv_path):
+    # the cache is only valid for the exact csv it was built from
+    stat = os.stat(csv_path)
+    return (CACHE_VERSION, stat.st_size, stat.st_mtime_ns)
+
+def _read_cache(path, stamp):
+    try:
+        with open(path, 'rb') as f:
+            cached = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if cached.get('stamp') != stamp:
+        return None
+    return cached['data']
+
+def _write_cache(path, stamp, frame):
+    # written to a temp file first so a crash never leaves a half-written cache behind
+    try:
+        with open(path + '.tmp', 'wb') as f:
+            pickle.dump({'stamp': stamp, 'data': frame}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + '.tmp', path)
+    except OSError:
+        pass # read-only location, just skip caching
+
+def _engine(engine):
+    if engine == 'pyarrow' and importlib.util.find_spec('pyarrow') is None:
+        return 'c' # optional dependency, fall back to pandas' own parser
+    return engine
+
+def _parse(path, chunksize, first_chunksize, columns, engine, numbers_as_text, skip):
+    # yields (chunk as parsed, fraction of the file read so far), leaving out the first skip rows
+    # row labels count from the first row of the file either way
+    # asked for columns the csv does not have are left out, the charts needing them say so
+    header = pd.read_csv(path, nrows=0).columns
+    if columns is not None:
+        columns = [name for name in header if name in columns]
+    options = dict(usecols=columns, dtype=read_dtypes(columns, numbers_as_text))
+    if skip:
+        options['skiprows'] = range(1, skip + 1)
+    if engine == 'pyarrow':
+        chunk = pd.read_csv(path, engine='pyarrow', **options)
+        # pyarrow returns usecols in the order given, the c parser in file order; the cache
+        # is shared by both engines, so the columns are put back in file order
+        chunk = chunk[[name for name in header if name in chunk.columns]]
+        chunk.index += skip
+        yield chunk, 1.0
+        return
+    total = os.path.getsize(path) or 1
+    with open(path, 'rb') as f, pd.read_csv(f, chunksize=chunksize, **options) as reader:
+        size = first_chunksize
+        yielded = False
+        while True:
+            try:
+                chunk = reader.get_chunk(size)
+            except StopIteration:
+                return
+            if chunk.empty and yielded:
+                return
+            chunk.index += skip
+            yield chunk, min(f.tell() / total, 1.0)
+            yielded = True
+            size = chunksize
+
+def read_chunks(path=CSV_PATH, chunksize=CHUNK_SIZE, first_chunksize=FIRST_CHUNK_SIZE, deduplicator=None, columns=None, engine=CSV_ENGINE, bad_rows=None):
+    # yields (cleaned chunk, fraction of the file read so far) while the csv is parsed
+    # columns limits parsing to those csv columns, None parses all of them
+    # duplicates are dropped across chunks by row hash, pass a RowDeduplicator to read its count afterwards
+    # rows with numbers that do not fit schema.NUMERIC_DTYPES are skipped, their row numbers
+    # (1 is the first row after the header) are appended to bad_rows if it is given
+    path = os.path.expanduser(path)
+    if deduplicator is None:
+        deduplicator = RowDeduplicator()
+    engine = _engine(engine)
+    numbers_as_text = False
+    done = 0 # rows handed out so far
+    while True:
+        chunks = _parse(path, chunksize, first_chunksize, columns, engine, numbers_as_text, done)
+        while True:
+            try:
+                chunk, progress = next(chunks)
+            except StopIteration:
+                return
+            except ValueError:
+                if numbers_as_text:
+                    raise
+                break # a cell that is not a number, the rest is read again with numbers as text to find its row
+            done += len(chunk)
+            bad = invalid_rows(chunk, numbers_as_text)
+            if bad.any():
+                if bad_rows is not None:
+                    bad_rows.extend((chunk.index[bad] + 1).tolist())
+                chunk = chunk[~bad]
+            yield narrow_numbers(clean(chunk, deduplicator)), progress
+        numbers_as_text = True
+
+def load_movies(path=CSV_PATH, use_cache=True, on_chunk=None, columns=None, engine=CSV_ENGINE):
+    # returns the cleaned dataset (no duplicates, no missing values) with the column types from schema.py
+    # columns limits it to those csv columns (None for all), duplicates and missing values are
+    # then judged on those columns only
+    # frame.attrs['duplicates_dropped'] tells how many duplicate rows the csv had, frame.attrs['bad_rows']
+    # how many rows were skipped for invalid numbers and frame.attrs['bad_row_numbers'] which (the first 100)
+    # on_chunk(chunk, progress) is called with every cleaned chunk while the csv is parsed,
+    # not on a cache hit (the whole frame is there at once then)
+    path = os.path.expanduser(path)
+    stamp = source_stamp(path)
+    if use_cache:
+        frame = _read_cache(cache_path(path, columns), stamp)
+        if frame is not None:
+            return frame
+    deduplicator = RowDeduplicator()
+    bad_rows = []
+    chunks = []
+    for chunk, progress in read_chunks(path, deduplicator=deduplicator, columns=columns, engine=engine, bad_rows=bad_rows):
+        chunks.append(chunk)
+        if on_chunk is not None:
+            on_chunk(chunk, progress)
+    frame = apply_schema(pd.concat(chunks))
+    frame.attrs['duplicates_dropped'] = deduplicator.dropped
+    frame.attrs['bad_rows'] = len(bad_rows)
+    frame.attrs['bad_row_numbers'] = bad_rows[:100]
+    if use_cache:
+        _write_cache(cache_path(path, columns), stamp, frame)
+    return frame
+
+def load_dataset(path=CSV_PATH, on_chunk=None, columns=None):
+    # what the Apps load: the DataFrame of load_movies(), or for a csv over STORE_BYTES a
+    # mmap_store.ColumnStore of those columns, which keeps the rows on disk (on_chunk is not
+    # called then, the store has no partial results to show)
+    path = os.path.expanduser(path)
+    if os.path.getsize(path) > STORE_BYTES:
+        from mmap_store import open_store # imports this module
+        return open_store(path, columns=columns)
+    return load_movies(path, on_chunk=on_chunk, columns=columns)
@@ -0,0 +1,209 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+from loader import CSV_PATH, read_chunks, source_stamp
+from schema import CATEGORICAL_COLUMNS, NUMERIC_DTYPES
+from dedupe import RowDeduplicator
+
+# memory-mapped columnar copy of the dataset for catalogs too big to keep in a DataFrame
+# numeric columns are raw binary arrays opened with np.memmap, string columns are one
+# utf-8 blob plus an int64 offsets array (row i is blob[offsets[i]:offsets[i + 1]]) and
+# schema.CATEGORICAL_COLUMNS are int32 codes into a list of categories kept in meta.json,
+# so they come out as pandas categoricals without decoding a string per row
+# nothing is read from disk until a column (or a slice of it) is actually used
+
+META_FILE = 'meta.json'
+STORE_VERSION = 3 # bump when the store layout or the way it is built changes so old stores are rebuilt
+
+class StringColumn:
+    def __init__(self, offsets, blob):
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, row):
+        start, end = self._offsets[row], self._offsets[row + 1]
+        return bytes(self._blob[start:end]).decode('utf-8')
+
+    def _decode(self, start, end):
+        # rows start to end - 1, read from the blob in one piece
+        offsets = self._offsets[start:end + 1]
+        base = int(offsets[0])
+        data = bytes(self._blob[base:int(offsets[-1])])
+        bounds = (offsets - base).tolist()
+        if data.isascii():
+            # one character per byte, so the whole run is decoded at once and sliced
+            text = data.decode('ascii')
+            return [text[low:high] for low, high in zip(bounds, bounds[1:])]
+        return [data[low:high].decode('utf-8') for low, high in zip(bounds, bounds[1:])]
+
+    def take(self, rows):
+        # decodes only the requested rows, a run of consecutive rows in one read
+        rows = np.asarray(rows)
+        if len(rows) and rows[-1] - rows[0] == len(rows) - 1 and (np.diff(rows) == 1).all():
+            return self._decode(int(rows[0]), int(rows[-1]) + 1)
+        return [self[row] for row in rows]
+
+    def to_numpy(self, rows=None):
+        values = self._decode(0, len(self)) if rows is None else self.take(rows)
+        return np.array(values, dtype=object)
+
+class CategoryColumn:
+    def __init__(self, codes, categories):
+        self._codes = codes
+        # codes are numbered in the order values first appeared, the categoricals come out
+        # with sorted categories like schema.apply_schema() makes them
+        order = np.argsort(categories, kind='stable')
+        self._categories = [categories[i] for i in order]
+        self._recode = np.empty(len(categories), dtype=np.int32)
+        self._recode[order] = np.arange(len(categories), dtype=np.int32)
+
+    def __len__(self):
+        return len(self._codes)
+
+    def categorical(self, rows=None):
+        codes = self._codes if rows is None else self._codes[rows]
+        return pd.Categorical.from_codes(self._recode[codes], self._categories)
+
+def _open_array(path, dtype, length):
+    # np.memmap refuses empty files
+    if length == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', shape=(length,))
+
+class ColumnStore:
+    def __init__(self, directory, columns=None):
+        # columns limits the store to those columns (None for all of them), they keep the csv's order
+        self._directory = directory
+        with open(os.path.join(directory, META_FILE)) as f:
+            meta = json.load(f)
+        self.columns = [column['name'] for column in meta['columns'] if columns is None or column['name'] in columns]
+        self._kinds = {column['name']: column['dtype'] for column in meta['columns']} # numpy dtype string, 'str' or 'category'
+        self._categories = {column['name']: column['categories'] for column in meta['columns'] if column['dtype'] == 'category'}
+        self._files = {column['name']: column['file'] for column in meta['columns']}
+        self._length = meta['rows']
+        self.duplicates_dropped = meta.get('duplicates_dropped', 0)
+        self.bad_rows = meta.get('bad_rows', 0)
+        self.bad_row_numbers = meta.get('bad_row_numbers', [])
+        self._opened = {}
+
+    def __len__(self):
+        return self._length
+
+    def is_numeric(self, name):
+        return self._kinds[name] not in ('str', 'category')
+
+    def column(self, name):
+        # np.memmap for numeric columns, StringColumn for strings, CategoryColumn for categoricals
+        if name not in self._opened:
+            base = os.path.join(self._directory, self._files[name])
+            if self._kinds[name] == 'category':
+                self._opened[name] = CategoryColumn(_open_array(base + '.codes', np.int32, self._length), self._categories[name])
+            elif self.is_numeric(name):
+                self._opened[name] = _open_array(base + '.bin', np.dtype(self._kinds[name]), self._length)
+            else:
+                offsets = _open_array(base + '.offsets', np.int64, self._length + 1)
+                blob_size = int(offsets[-1]) if len(offsets) else 0
+                self._opened[name] = StringColumn(offsets, _open_array(base + '.blob', np.uint8, blob_size))
+        return self._opened[name]
+
+    def frame(self, columns=None, rows=None):
+        # materializes only the requested columns (and rows) as a DataFrame
+        columns = self.columns if columns is None else columns
+        values = {}
+        for name in columns:
+            column = self.column(name)
+            if self._kinds[name] == 'category':
+                values[name] = column.categorical(rows)
+            elif self.is_numeric(name):
+                values[name] = np.asarray(column if rows is None else column[rows])
+            else:
+                values[name] = column.to_numpy(rows)
+        index = pd.RangeIndex(self._length) if rows is None else pd.Index(np.asarray(rows))
+        return pd.DataFrame(values, index=index, columns=columns)
+
+def build_store(csv_path, directory, chunksize=100_000, stamp=None):
+    # converts the csv chunk by chunk, so it never has to fit in memory
+    # the chunks come from loader.read_chunks(), so rows are cleaned and checked like load_movies()
+    # does it: duplicates (found across chunks by row hash, see dedupe.py) and rows with missing
+    # values are dropped, rows with invalid numbers skipped
+    # numeric columns are stored as their schema.NUMERIC_DTYPES type, schema.CATEGORICAL_COLUMNS
+    # as codes and everything else as text, so no chunk decides a column's type
+    os.makedirs(directory, exist_ok=True)
+    meta_path = os.path.join(directory, META_FILE)
+    if os.path.exists(meta_path):
+        os.remove(meta_path) # a store without meta.json is treated as missing until the build finishes
+
+    columns = None
+    handles = {}
+    string_ends = {} # running blob size per string column
+    categories = {} # categorical column -> {value: code}, in the order the values first appeared
+    rows = 0
+    deduplicator = RowDeduplicator()
+    bad_rows = []
+    try:
+        for chunk, _ in read_chunks(csv_path, chunksize, chunksize, deduplicator=deduplicator, bad_rows=bad_rows):
+            if columns is None:
+                columns = []
+                for i, name in enumerate(chunk.columns):
+                    numeric = name in NUMERIC_DTYPES
+                    categorical = name in CATEGORICAL_COLUMNS
+                    columns.append({'name': name, 'file': str(i), 'dtype': np.dtype(NUMERIC_DTYPES[name]).str if numeric else 'category' if categorical else 'str'})
+                    base = os.path.join(directory, str(i))
+                    if numeric:
+                        handles[name] = open(base + '.bin', 'wb')
+                    elif categorical:
+                        handles[name] = open(base + '.codes', 'wb')
+                        categories[name] = {}
+                    else:
+                        handles[name] = (open(base + '.offsets', 'wb'), open(base + '.blob', 'wb'))
+                        np.zeros(1, dtype=np.int64).tofile(handles[name][0])
+                        string_ends[name] = 0
+            for column in columns:
+                name = column['name']
+                if column['dtype'] == 'category':
+                    # codes of the chunk's own distinct values, mapped onto the store's codes
+                    codes, uniques = pd.factorize(chunk[name].astype(str))
+                    seen = categories[name]
+                    mapping = np.array([seen.setdefault(value, len(seen)) for value in uniques], dtype=np.int32)
+                    mapping[codes].tofile(handles[name])
+                elif column['dtype'] == 'str':
+                    encoded = [text.encode('utf-8') for text in chunk[name].astype(str)]
+                    lengths = np.fromiter((len(text) for text in encoded), dtype=np.int64, count=len(encoded))
+                    offsets, blob = handles[name]
+                    (string_ends[name] + np.cumsum(lengths)).tofile(offsets)
+                    blob.write(b''.join(encoded))
+                    string_ends[name] += int(lengths.sum())
+                else:
+                    # read_chunks() already checked every value fits the type
+                    chunk[name].to_numpy().astype(column['dtype']).tofile(handles[name])
+            rows += len(chunk)
+    finally:
+        for handle in handles.values():
+            for f in (handle if isinstance(handle, tuple) else (handle,)):
+                f.close()
+
+    for column in columns or []:
+        if column['dtype'] == 'category':
+            column['categories'] = list(categories[column['name']])
+    with open(meta_path, 'w') as f:
+        json.dump({'stamp': stamp, 'rows': rows, 'duplicates_dropped': deduplicator.dropped, 'bad_rows': len(bad_rows), 'bad_row_numbers': bad_rows[:100], 'columns': columns or []}, f)
+    return ColumnStore(directory)
+
+def open_store(path=CSV_PATH, chunksize=100_000, columns=None):
+    # opens the store kept next to the csv, rebuilding it when the csv has changed
+    # the store always holds every csv column, columns only limits what the returned ColumnStore shows
+    path = os.path.expanduser(path)
+    directory = path + '.store'
+    stamp = [STORE_VERSION, *source_stamp(path)]
+    try:
+        with open(os.path.join(directory, META_FILE)) as f:
+            if json.load(f).get('stamp') == stamp:
+                return ColumnStore(directory, columns)
+    except (OSError, ValueError):
+        pass
+    build_store(path, directory, chunksize=chunksize, stamp=stamp)
+    return ColumnStore(directory, columns)
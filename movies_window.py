@@ -0,0 +1,157 @@
+import random
+from PyQt5.QtWidgets import QMainWindow, QProgressBar, QHeaderView
+from data_table import DataTable
+from startup import LoadingModel, DatasetLoader
+
+# what every movies window does once its layout is built: loading the dataset off the GUI
+# thread, the table with its search boxes and the charts with the Chart Selection button
+# an App builds its widgets (table_view, search_layout, buttons, ...) and calls start_loading(),
+# it only overrides what depends on its layout: add_canvas() for where the charts go,
+# view_dataframe() and chart_visible()
+# this module only imports Qt, keep it that way (see import_budget.py)
+
+def _load_and_prepare(load_data, on_chunk):
+    # runs on the loader thread: loads the dataset and builds the slow parts of its table, so
+    # data_loaded() on the GUI thread only wraps finished pieces in models
+    # returns (frame for the charts, table_model.TableData for a PandasModel, None) for a DataFrame
+    # and (frame for the charts, None, the store) for a mmap_store.ColumnStore
+    # every chunk is stringified once here, for the StreamingModel now and the PandasModel later
+    import pandas as pd
+    from loader import needed_columns
+    from schema import apply_schema
+    from table_model import TableData
+    table = TableData()
+    def chunk_loaded(chunk, progress):
+        on_chunk((list(chunk.columns), *table.append(chunk)), progress)
+    dataset = load_data(chunk_loaded)
+    if isinstance(dataset, pd.DataFrame):
+        return dataset, table.finish(dataset), None
+    # a store: only the chart columns are read into memory, the text ones as categoricals,
+    # the table reads its rows from disk as it scrolls
+    frame = apply_schema(dataset.frame([name for name in needed_columns() if name in dataset.columns]))
+    frame.attrs.update(duplicates_dropped=dataset.duplicates_dropped, bad_rows=dataset.bad_rows)
+    return frame, None, dataset
+
+class MoviesWindow(QMainWindow):
+    def start_loading(self, load_data):
+        # load_data(on_chunk) runs on the loader thread, see startup.DatasetLoader
+        self.data = None # set by data_loaded()
+        self.dataset_aggregates = None # groupby results shared by the charts, computed once per dataset
+        self.selection_aggregates = None # same charts over just the rows the search boxes leave
+        self.aggregates = None # one of the two above, swapped by the Chart Selection button
+        self.current_chart = None # chart method on screen, redrawn when the selection changes
+        self._color = None # colour of the chart on screen, kept while refresh_chart() redraws it
+        self._refreshing = False
+        self.model = None
+        # show a loading note until the DataFrame is ready
+        self.table_view.setModel(LoadingModel())
+        self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.loader = DatasetLoader(lambda on_chunk: _load_and_prepare(load_data, on_chunk), parent=self)
+        self.loader.loaded.connect(self.data_loaded)
+        self.loader.chunk_loaded.connect(self.chunk_loaded)
+        self.loader.failed.connect(self.load_failed)
+        self.progress = QProgressBar() # how much of the csv has been read, hidden once loading is done
+        self.progress.setRange(0, 100)
+        self.statusBar().addPermanentWidget(self.progress)
+        self.loader.start()
+
+    def add_canvas(self, canvas):
+        self.layout.addWidget(canvas)
+
+    def build_charts(self):
+        # already imported by the loader thread, so this is cheap
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+        from chart_render import ChartRenderer
+
+        # create a matplotlib figure and canvas
+        self.figure = Figure()
+        self.ax = self.figure.add_subplot(111)
+        self.canvas = FigureCanvas(self.figure)
+        self.charts = ChartRenderer(self.canvas, self.ax) # one persistent set of artists per chart
+        self.add_canvas(self.canvas)
+
+    def chunk_loaded(self, rows, progress):
+        # shows the rows parsed so far while the rest of the csv is being read
+        # rows is (column names, cells, row labels) of the new rows, already stringified
+        from table_model import StreamingModel
+        columns, cells, row_labels = rows
+        if not isinstance(self.table_view.model(), StreamingModel):
+            self.table_view.setModel(StreamingModel(columns))
+        self.table_view.model().append_rows(cells, row_labels)
+        self.progress.setValue(round(progress * 100))
+
+    def load_failed(self, message):
+        self.table_view.setModel(LoadingModel(message))
+        self.progress.hide()
+
+    def data_loaded(self, loaded):
+        # loaded is what _load_and_prepare() returned, for a csv loader.load_dataset() opened as
+        # a store the table has no search boxes, so there is no selection to chart either
+        from aggregates import AggregateCache, SelectionAggregates
+        from table_model import PandasModel, StoreModel
+        frame, table, store = loaded
+        if store is None:
+            self.model = PandasModel(frame, table)
+            self.model.layoutChanged.connect(self.selection_changed)
+        else:
+            self.model = StoreModel(store)
+        self.data = frame
+        self.dataset_aggregates = AggregateCache(frame)
+        self.selection_aggregates = SelectionAggregates(frame)
+        self.dataset_aggregates.start_warm_up() # chart summaries are computed in the background
+        self.aggregates = self.dataset_aggregates
+        self.build_charts()
+        for button in self.buttons:
+            button.setEnabled(True)
+        self.selection_button.setEnabled(isinstance(self.model, PandasModel))
+        self.progress.hide()
+        self.statusBar().showMessage(f"{len(frame)} movies, {frame.attrs.get('duplicates_dropped', 0)} duplicate rows dropped, {frame.attrs.get('bad_rows', 0)} rows with invalid numbers skipped")
+        # the table and its search boxes are built once, the View DataFrame button only shows them again
+        self.data_table = DataTable(self.table_view, self.search_layout, self.model, parent=self)
+        # initially show the DataFrame
+        self.view_dataframe()
+
+    def view_dataframe(self):
+        # clear previous plot- leads to unknown bugs otherwise
+        self.ax = self.charts.clear()
+        self.current_chart = None
+
+        # show DataFrame, with the search queries and sort order it had before
+        self.data_table.show()
+
+        # update the header
+        self.table_view.update()
+        self.table_view.viewport().update()
+        self.table_view.horizontalHeader().update()
+
+    def chart_visible(self):
+        return True
+
+    def chart_selection(self, checked):
+        # when checked, the charts only use the rows left by the search boxes
+        self.aggregates = self.selection_aggregates if checked else self.dataset_aggregates
+        self.refresh_chart()
+
+    def selection_changed(self):
+        # the table was filtered (or sorted, which leaves the selection as it is)
+        if self.selection_aggregates.set_rows(self.model.rows) and self.aggregates is self.selection_aggregates:
+            self.refresh_chart()
+
+    def refresh_chart(self):
+        # redraws the chart on screen from the current aggregates
+        if self.current_chart is not None and self.chart_visible():
+            self._refreshing = True
+            try:
+                self.current_chart()
+            finally:
+                self._refreshing = False
+
+    def chart_color(self, colors):
+        # a random colour for every chart button click, the same one again when the chart is only redrawn
+        if self._color is None or not self._refreshing:
+            self._color = random.choice(colors)
+        return self._color
+
+    def missing_columns(self):
+        self.ax = self.charts.message('Missing required columns. Sorry.')
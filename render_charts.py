@@ -0,0 +1,185 @@
+import argparse
+import os
+import sys
+import textwrap # used to format long strings of text (like movie titles) into multiple lines for better readability.
+import time
+from concurrent.futures import ProcessPoolExecutor
+import matplotlib
+matplotlib.use('Agg') # no display needed
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from loader import CSV_PATH, load_movies, needed_columns
+from aggregates import AggregateCache
+from chart_render import ChartRenderer
+import analytics
+
+# renders every chart of movies.py to image files without Qt or a display,
+# e.g. for a nightly report:
+#   python render_charts.py --out reports --format png svg --jobs 4
+# independent charts are spread over a process pool and each one's time is reported
+
+COLOR = 'maroon' # fixed instead of random so reports are comparable from night to night
+
+def name_vs_gross(charts, aggregates):
+    names, gross = analytics.top_grossing_movies(aggregates, 15)
+    wrap_names = [textwrap.fill(name, width=20) for name in names]
+    ax = charts.bar('name_vs_gross', wrap_names, gross, COLOR, horizontal=True, text_format=lambda width: f'${width/1e9:.1f}B', text_pad=1e7)
+    ax.set_title('15 Highest Grossing Movies', color='black')
+    ax.set_xlabel('Gross Revenue (Billions)', color='black')
+    ax.set_ylabel('Movie Name', color='black')
+
+def company_vs_revenue(charts, aggregates):
+    companies, gross = analytics.top_companies_by_gross(aggregates, 10)
+    wrap_company = [textwrap.fill(name, width=20) for name in companies]
+    ax = charts.bar('company_vs_revenue', wrap_company, gross, COLOR, horizontal=True, text_format=lambda width: f'${width/1e9:.1f}B', text_pad=1e7)
+    ax.set_title('Top 10 Production Companies by Revenue', color='black')
+    ax.set_ylabel('Production Company', color='black')
+    ax.set_xlabel('Total Revenue(in Billions)', color='black')
+
+def genre_vs_freq(charts, aggregates):
+    genres, counts = analytics.genre_counts(aggregates)
+    ax = charts.bar('genre_vs_freq', genres, counts, COLOR)
+    ax.set_title('Genres Popularity', color='black')
+    ax.set_xlabel('Genre', color='black')
+    ax.set_ylabel('Count', color='black')
+
+def budget_revenue(charts, aggregates):
+    years, budget, gross = analytics.yearly_budget_gross(aggregates)
+    ax = charts.lines('budget_revenue', [('budget', years, budget), ('gross', years, gross)])
+    ax.set_title('Budget and Revenue Correlation through the years')
+    ax.set_xlabel('Years')
+    ax.set_ylabel('Money (* 100 Million)')
+    ax.legend()
+
+def genre_vs_gross(charts, aggregates):
+    genres, gross = analytics.median_gross_by_genre(aggregates)
+    ax = charts.bar('genre_vs_gross', genres, gross, COLOR)
+    ax.set_title('Mean Gross by Genre')
+    ax.set_xlabel('Genre')
+    ax.set_ylabel('Gross (* 100 Million)')
+
+def country_vs_revenue(charts, aggregates):
+    countries, gross = analytics.top_countries_by_median_gross(aggregates, 10)
+    ax = charts.bar('country_vs_revenue', countries, gross, COLOR)
+    ax.set_title('Median Gross Revenue by Country (Top 10 Countries)')
+    ax.set_xlabel('Country', color = 'black')
+    ax.set_ylabel('Median Gross Revenue (in Billions)', color = 'black')
+
+def country_vs_score(charts, aggregates):
+    countries, scores = analytics.mean_score_by_country(aggregates, 20)
+    ax = charts.bar('country_vs_score', countries, scores, COLOR, horizontal=True, text_format=lambda value: f'{value:.2f}', text_pad=0.01)
+    ax.set_title('Avg Ratings by Country', color = 'black')
+    ax.set_xlabel('Country', color = 'black')
+    ax.set_ylabel('Ratings', color = 'black')
+
+def directors_score(charts, aggregates):
+    directors, scores = analytics.top_directors_by_score(aggregates, 25)
+    ax = charts.bar('directors_score', directors, scores, COLOR, horizontal=True, text_format=lambda width: f'{width:.2f}', text_pad=0.01)
+    ax.set_title('Directors by Score', color='black')
+    ax.set_xlabel('Director', color='black')
+    ax.set_ylabel('Average Score', color='black')
+
+def directors_gross(charts, aggregates):
+    directors, gross = analytics.top_directors_by_gross(aggregates, 25)
+    ax = charts.bar('directors_gross', directors, gross, COLOR, horizontal=True)
+    ax.set_title('Directors by Gross Revenue', color='black')
+    ax.set_ylabel('Director', color='black')
+    ax.set_xlabel('Total Gross (* 100 Million)', color='black')
+
+def budget_distribution(charts, aggregates):
+    ax = charts.hist('budget_distribution', analytics.column_values(aggregates, 'budget'), COLOR, bins=30)
+    ax.set_title('Budget Distribution', color='black')
+    ax.set_xlabel('Budget (* 100 Millions)', color='black')
+    ax.set_ylabel('Frequency', color='black')
+    ax.grid(axis='y', linestyle=':', alpha=0.7)
+
+def runtime_distribution(charts, aggregates):
+    ax = charts.hist('runtime_distribution', analytics.column_values(aggregates, 'runtime'), COLOR, bins=30)
+    ax.set_title('Runtime Distribution', color='black')
+    ax.set_xlabel('Runtime (minutes)', color='black')
+    ax.set_ylabel('Frequency', color='black')
+    ax.grid(axis='y', linestyle=':', alpha=0.7)
+
+def preferred_genres(charts, aggregates):
+    genres, counts = analytics.genre_counts(aggregates, 15)
+    ax = charts.bar('preferred_genres', genres, counts, COLOR, text_format=str, text_pad=15)
+    ax.set_title('Preferred Genres', color='black')
+    ax.set_xlabel('Genre', color='black')
+    ax.set_ylabel('Count', color='black')
+
+def rating_popularity(charts, aggregates):
+    ratings, counts = analytics.rating_counts(aggregates)
+    ax = charts.bar('rating_popularity', ratings, counts, COLOR, text_format=str, text_pad=15)
+    ax.set_xlabel('Rating')
+    ax.set_ylabel('Count')
+    ax.set_title('Rating Distribution')
+
+# chart name -> drawing function, in the order of the buttons
+# the columns each one needs are in analytics.CHART_COLUMNS
+CHARTS = {
+    'name_vs_gross': name_vs_gross,
+    'company_vs_revenue': company_vs_revenue,
+    'genre_vs_freq': genre_vs_freq,
+    'budget_revenue': budget_revenue,
+    'genre_vs_gross': genre_vs_gross,
+    'country_vs_revenue': country_vs_revenue,
+    'country_vs_score': country_vs_score,
+    'directors_score': directors_score,
+    'directors_gross': directors_gross,
+    'budget_distribution': budget_distribution,
+    'runtime_distribution': runtime_distribution,
+    'preferred_genres': preferred_genres,
+    'rating_popularity': rating_popularity,
+}
+
+_aggregates = None # per worker process, loaded once by _init_worker
+
+def _init_worker(csv_path):
+    global _aggregates
+    _aggregates = AggregateCache(load_movies(csv_path, columns=needed_columns()))
+
+def render_chart(name, out_dir, formats, size=(12, 8), dpi=100):
+    # draws one chart on its own Agg figure and saves it in every format,
+    # returns (name, seconds spent computing and drawing, seconds spent writing files, paths)
+    start = time.perf_counter()
+    figure = Figure(figsize=size)
+    canvas = FigureCanvasAgg(figure)
+    charts = ChartRenderer(canvas, figure.add_subplot(111))
+    if all(column in _aggregates.data.columns for column in analytics.CHART_COLUMNS[name]):
+        CHARTS[name](charts, _aggregates)
+    else:
+        charts.message('Missing required columns. Sorry.')
+    canvas.draw()
+    drawn = time.perf_counter()
+    paths = []
+    for fmt in formats:
+        path = os.path.join(out_dir, f'{name}.{fmt}')
+        figure.savefig(path, format=fmt, dpi=dpi)
+        paths.append(path)
+    return name, drawn - start, time.perf_counter() - drawn, paths
+
+def render_all(names, out_dir, formats, jobs=None, csv_path=CSV_PATH):
+    os.makedirs(out_dir, exist_ok=True)
+    load_movies(csv_path, columns=needed_columns()) # builds the binary cache once before the workers all try to
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(csv_path,)) as pool:
+        futures = [pool.submit(render_chart, name, out_dir, formats) for name in names]
+        return [future.result() for future in futures]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render the movies charts to image files without a display.')
+    parser.add_argument('--csv', default=CSV_PATH, help='path to movies.csv')
+    parser.add_argument('--out', default='charts', help='output directory')
+    parser.add_argument('--format', nargs='+', default=['png'], choices=['png', 'svg', 'pdf'], help='file formats to write')
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: one per CPU)')
+    parser.add_argument('--only', nargs='+', choices=list(CHARTS), default=list(CHARTS), help='charts to render')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = render_all(args.only, args.out, args.format, jobs=args.jobs, csv_path=args.csv)
+    for name, draw_time, save_time, paths in results:
+        print(f'{name:22} draw {draw_time * 1000:8.1f} ms  save {save_time * 1000:8.1f} ms  -> {", ".join(paths)}')
+    print(f'{len(results)} charts in {time.perf_counter() - start:.2f} s')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
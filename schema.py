@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+# column types for movies.csv
+
+# low-cardinality text columns are loaded as pandas categoricals: every value becomes a
+# small integer code into a per-column dictionary, so groupby/value_counts/isin work on
+# the codes instead of hashing the strings again on every chart click
+CATEGORICAL_COLUMNS = ['rating', 'genre', 'country', 'company', 'director']
+
+TEXT_COLUMNS = ['name', 'rating', 'genre', 'released', 'director', 'writer', 'star', 'country', 'company']
+
+# numeric columns and the dtype each one is stored as once its missing values are dropped
+# years and runtimes (minutes) fit an int16, money and vote counts need an int64,
+# a score has one decimal so a float32 is plenty
+NUMERIC_DTYPES = {'year': 'int16', 'runtime': 'int16', 'score': 'float32', 'votes': 'int64', 'budget': 'int64', 'gross': 'int64'}
+
+def read_dtypes(columns=None, numbers_as_text=False):
+    # dtypes handed to the csv reader for the columns being read (None for all of them)
+    # numbers are parsed as float64 so missing values fit, or kept as text so invalid_rows()
+    # can tell which cells are not numbers at all
+    dtypes = {name: 'str' for name in TEXT_COLUMNS}
+    dtypes.update({name: 'str' if numbers_as_text else 'float64' for name in NUMERIC_DTYPES})
+    return {name: dtype for name, dtype in dtypes.items() if columns is None or name in columns}
+
+def invalid_rows(frame, numbers_as_text=False):
+    # mask of the rows whose numbers do not fit NUMERIC_DTYPES: text that is not a number,
+    # fractions in an int column, or values outside its range
+    # with numbers_as_text the numeric columns are parsed to float64 in place on the way
+    # missing values are not invalid, clean() drops those rows
+    bad = np.zeros(len(frame), dtype=bool)
+    for name, dtype in NUMERIC_DTYPES.items():
+        if name not in frame.columns:
+            continue
+        values = frame[name]
+        if numbers_as_text:
+            parsed = pd.to_numeric(values, errors='coerce').astype('float64')
+            bad |= (parsed.isna() & values.notna()).to_numpy()
+            frame[name] = values = parsed
+        if dtype.startswith('int'):
+            limits = np.iinfo(dtype)
+            bad |= (values.notna() & ((values % 1 != 0) | (values < limits.min) | (values > limits.max))).to_numpy()
+    return bad
+
+def narrow_numbers(frame):
+    # stores the numeric columns as NUMERIC_DTYPES, columns still holding missing values stay float64
+    for name, dtype in NUMERIC_DTYPES.items():
+        if name in frame.columns and frame[name].dtype != dtype and not frame[name].isna().any():
+            frame[name] = frame[name].astype(dtype)
+    return frame
+
+def apply_schema(frame):
+    for name in CATEGORICAL_COLUMNS:
+        if name in frame.columns:
+            frame[name] = frame[name].astype('category')
+    return narrow_numbers(frame)
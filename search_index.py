@@ -0,0 +1,132 @@
+import re
+import numpy as np
+import pandas as pd
+
+# per-column index for the search boxes
+# the lowercased strings are built once, and each column gets a trigram -> rows
+# postings table the first time it is searched, so a substring lookup only has to
+# check the rows that contain every trigram of the query
+# numeric columns also take ranges, run on the numbers instead of their strings:
+#   >1e8  >=5  <7.5  <=120  =2010  2010  2000..2010  2000..  ..1990
+# bounds are inclusive for "..", a plain number matches that value only; anything else
+# typed in a numeric box falls back to the substring search
+# each numeric column is argsorted the first time it gets a range, after that a range is
+# two binary searches plus the k matching rows
+
+_NUMBER = r'\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*'
+_COMPARISON = re.compile(r'\s*(>=|<=|>|<|=)?' + _NUMBER + '$')
+_BETWEEN = re.compile(r'(?:' + _NUMBER + r')?\.\.(?:' + _NUMBER + r')?$')
+
+def parse_range(query):
+    # (low, high, low inclusive, high inclusive) for a range query, None if query is not one
+    match = _COMPARISON.match(query)
+    if match:
+        operator, value = match.group(1) or '=', float(match.group(2))
+        return {
+            '>': (value, np.inf, False, True),
+            '>=': (value, np.inf, True, True),
+            '<': (-np.inf, value, True, False),
+            '<=': (-np.inf, value, True, True),
+            '=': (value, value, True, True),
+        }[operator]
+    match = _BETWEEN.match(query)
+    if match and (match.group(1) or match.group(2)):
+        low = float(match.group(1)) if match.group(1) else -np.inf
+        high = float(match.group(2)) if match.group(2) else np.inf
+        return low, high, True, True
+    return None
+
+class SearchIndex:
+    def __init__(self, data_frame):
+        # lowercased display strings, one object array per column
+        self._lowered = [data_frame.iloc[:, col].astype(str).str.lower().to_numpy(dtype=object) for col in range(len(data_frame.columns))]
+        self._postings = {} # column index -> {trigram: sorted array of row positions}
+        self._all_rows = np.arange(len(data_frame))
+        # raw values of the numeric columns, column index -> array (not copied)
+        self._numbers = {col: data_frame.iloc[:, col].to_numpy() for col in range(len(data_frame.columns)) if pd.api.types.is_numeric_dtype(data_frame.dtypes.iloc[col]) and not pd.api.types.is_bool_dtype(data_frame.dtypes.iloc[col])}
+        self._sorted = {} # column index -> (row positions in ascending order, values in that order)
+
+    def __len__(self):
+        return len(self._all_rows)
+
+    def _column_postings(self, column):
+        # builds the trigram table for a column on first use
+        if column not in self._postings:
+            table = {}
+            for row, text in enumerate(self._lowered[column]):
+                for gram in {text[i:i + 3] for i in range(len(text) - 2)}:
+                    table.setdefault(gram, []).append(row)
+            self._postings[column] = {gram: np.array(rows, dtype=np.int64) for gram, rows in table.items()}
+        return self._postings[column]
+
+    def _candidates(self, column, query):
+        # rows that contain every trigram of the query, smallest postings list first
+        postings = self._column_postings(column)
+        grams = {query[i:i + 3] for i in range(len(query) - 2)}
+        if not all(gram in postings for gram in grams):
+            return self._all_rows[:0]
+        lists = sorted((postings[gram] for gram in grams), key=len)
+        rows = lists[0]
+        for other in lists[1:]:
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
+
+    def is_numeric(self, column):
+        return column in self._numbers
+
+    def _range_query(self, column, query):
+        # parsed range if query is one and column is numeric, else None
+        return parse_range(query) if column in self._numbers else None
+
+    def narrows(self, column, query, new_query):
+        # whether every row matching new_query also matches query, so a search for new_query
+        # can start from query's result; a longer substring narrows, a changed range may not
+        if new_query == query:
+            return True
+        if self._range_query(column, query) is not None or self._range_query(column, new_query) is not None:
+            return False
+        return query.lower() in new_query.lower()
+
+    def _search_range(self, column, bounds, rows):
+        if column not in self._sorted:
+            values = self._numbers[column]
+            order = np.argsort(values, kind='stable') # missing values end up last, outside every range
+            self._sorted[column] = (order, values[order])
+        order, values = self._sorted[column]
+        low, high, low_inclusive, high_inclusive = bounds
+        if np.issubdtype(values.dtype, np.integer):
+            # integer bounds in the column's dtype, a float bound would make searchsorted convert the whole column
+            limits = np.iinfo(values.dtype)
+            low = np.ceil(low) if low_inclusive else np.floor(low) + 1
+            high = np.floor(high) if high_inclusive else np.ceil(high) - 1
+            if low > limits.max or high < limits.min or low > high:
+                return self._all_rows[:0]
+            low, high = values.dtype.type(max(low, limits.min)), values.dtype.type(min(high, limits.max))
+            low_inclusive = high_inclusive = True
+        else:
+            # compared in the column's own precision, so =7.3 finds a float32 7.3
+            low, high = values.dtype.type(low), values.dtype.type(high)
+        start = np.searchsorted(values, low, side='left' if low_inclusive else 'right')
+        end = np.searchsorted(values, high, side='right' if high_inclusive else 'left')
+        found = np.sort(order[start:end])
+        if rows is not None:
+            found = np.intersect1d(found, rows, assume_unique=True)
+        return found
+
+    def search(self, column, query, rows=None):
+        # returns the sorted positions of rows whose column contains query (case-insensitive),
+        # or for a numeric column whose value is in the range query describes
+        # if rows is given, only those positions are considered
+        bounds = self._range_query(column, query)
+        if bounds is not None:
+            return self._search_range(column, bounds, rows)
+        query = query.lower()
+        if len(query) >= 3:
+            candidates = self._candidates(column, query)
+            if rows is not None:
+                candidates = np.intersect1d(candidates, rows, assume_unique=True)
+        else:
+            candidates = self._all_rows if rows is None else rows
+        lowered = self._lowered[column]
+        keep = np.fromiter((query in lowered[row] for row in candidates), dtype=bool, count=len(candidates))
+        return candidates[keep]
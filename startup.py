@@ -0,0 +1,78 @@
+import importlib
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QObject, QRunnable, QThreadPool, pyqtSignal
+
+# lets a window show up before pandas, matplotlib and the csv are loaded
+# the App shows a LoadingModel in its table, hands the slow part to a DatasetLoader,
+# shows the chunks reported by chunk_loaded() as they are parsed and builds the real
+# table and charts when loaded() fires
+# this module only imports Qt, keep it that way (see import_budget.py)
+
+# imported on the loader thread, so building the table and the canvas afterwards costs no import time
+PRELOAD_MODULES = ['numpy', 'pandas', 'matplotlib.figure', 'matplotlib.backends.backend_qt5agg', 'loader', 'aggregates', 'table_model', 'chart_render']
+
+class LoadingModel(QAbstractTableModel):
+    # a one cell table telling the user what is going on
+    def __init__(self, text='Loading movies...'):
+        super().__init__()
+        self._text = text
+
+    def set_text(self, text):
+        self._text = text
+        self.dataChanged.emit(self.index(0, 0), self.index(0, 0))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 1
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and index.isValid():
+            return self._text
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        return None
+
+class _LoadSignals(QObject):
+    chunk_loaded = pyqtSignal(object, float) # (just parsed rows, in whatever form load passes them, fraction of the file read)
+    loaded = pyqtSignal(object) # whatever the load function returned
+    failed = pyqtSignal(str)
+
+class _LoadJob(QRunnable):
+    def __init__(self, load, signals):
+        super().__init__()
+        self._load = load
+        self._signals = signals
+
+    def run(self):
+        try:
+            result = self._load(self._signals.chunk_loaded.emit)
+            for name in PRELOAD_MODULES: # after load(), so its first chunk is not held up by matplotlib
+                importlib.import_module(name)
+        except Exception as error: # shown in the table instead of killing the window
+            self._signals.failed.emit(f'Could not load the movies: {error}')
+            return
+        self._signals.loaded.emit(result)
+
+class DatasetLoader(QObject):
+    # runs load(on_chunk) on a worker thread, load may call on_chunk(rows, progress) for partial results
+    # chunk_loaded/loaded/failed are delivered on the GUI thread
+    chunk_loaded = pyqtSignal(object, float)
+    loaded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, load, parent=None):
+        super().__init__(parent)
+        self._load = load
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._signals = _LoadSignals()
+        self._signals.chunk_loaded.connect(self.chunk_loaded)
+        self._signals.loaded.connect(self.loaded)
+        self._signals.failed.connect(self.failed)
+
+    def start(self):
+        self._pool.start(_LoadJob(self._load, self._signals))
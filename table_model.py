@@ -0,0 +1,342 @@
+import numpy as np
+import pandas as pd # library for data manipulation and analysis, which allows for easy handling of data
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from search_index import SearchIndex
+
+# shared by every App variant so the table behaves the same everywhere
+
+def stringify(frame):
+    # every column as a list of display strings, plus the row labels
+    cells = [frame.iloc[:, col].astype(str).tolist() for col in range(len(frame.columns))]
+    return cells, frame.index.astype(str).tolist()
+
+class TableData:
+    # the slow part of a PandasModel: the display strings of every cell and the search index
+    # plain python, so the Apps build it on the loader thread and hand it to PandasModel
+    # rows can be added chunk by chunk while the csv is read (and shown in a StreamingModel),
+    # finish() then only has to index the whole frame
+    def __init__(self):
+        self.frame = None
+        self.cells = None
+        self.row_labels = []
+        self.index = None
+
+    def append(self, chunk):
+        # stringifies the chunk's rows once, returns their (cells, row labels)
+        cells, row_labels = stringify(chunk)
+        if self.cells is None:
+            self.cells = [[] for _ in cells]
+        for column, new_cells in zip(self.cells, cells):
+            column.extend(new_cells)
+        self.row_labels.extend(row_labels)
+        return cells, row_labels
+
+    def finish(self, frame):
+        # frame is the loaded dataset, the appended chunks are used if they are exactly its rows
+        # (they are not on a cache hit, nothing was streamed then)
+        if self.cells is None or len(self.cells) != len(frame.columns) or self.row_labels != frame.index.astype(str).tolist():
+            self.cells, self.row_labels = stringify(frame)
+        self.frame = frame
+        self.index = SearchIndex(frame) # lowercased strings for the search boxes
+        return self
+
+#model for displaying df
+class PandasModel(QAbstractTableModel):
+    def __init__(self, data_frame=pd.DataFrame(), table=None):
+        # table is a finished TableData of data_frame, built on another thread, None builds it here
+        super().__init__()
+        if table is None:
+            table = TableData().finish(data_frame)
+        self._original_data = data_frame # storing the original unfiltered df, never copied or reordered
+        # display strings of every row, built once, so data() is a plain list lookup instead of
+        # an iloc call + str() per repaint and sorting/filtering never has to stringify again
+        self._cells, self._row_labels = table.cells, table.row_labels
+        self._index = table.index
+        self._sort_orders = {} # (column name, ascending) -> positions of every row in that order, built on first sort
+        self._sort_ranks = {} # column name -> (rank of every row's value, number of ranks), for multi-key sorts
+        self._filters = {} # active search queries, column index -> query
+        self._rows = None # positions of the rows matching every query, None when nothing is filtered
+        self._sort_key = None # ((column name, ascending), ...) most significant first, reapplied after a rescan
+        self._view = None # positions of the rows shown, in display order, None for every row unsorted
+
+    def _sort_order(self, column_name, ascending):
+        # stable argsort of a whole column in one direction, cached: flipping back, filtering
+        # or sorting by this column again only reuses it
+        # descending sorts the mirrored ranks like the multi-key path, so equal values keep
+        # file order in both directions
+        order = self._sort_orders.get((column_name, ascending))
+        if order is None:
+            ranks, count = self._sort_rank(column_name)
+            order = np.argsort(ranks if ascending else count - 1 - ranks, kind='stable')
+            self._sort_orders[(column_name, ascending)] = order
+        return order
+
+    def _sort_rank(self, column_name):
+        # dense ranks of a whole column (equal values share a rank) and how many there are, cached
+        # missing values rank last
+        cached = self._sort_ranks.get(column_name)
+        if cached is None:
+            ranks, uniques = pd.factorize(self._original_data[column_name], sort=True)
+            ranks[ranks < 0] = len(uniques)
+            cached = self._sort_ranks[column_name] = (ranks, len(uniques) + 1)
+        return cached
+
+    def _arrange(self, rows, sort_key):
+        # positions of rows (None for all of them) in the order sort_key asks for
+        if not sort_key:
+            return rows
+        if len(sort_key) == 1:
+            (column_name, ascending), = sort_key
+            order = self._sort_order(column_name, ascending)
+            if rows is not None:
+                # the cached order restricted to rows, O(n) with no sorting
+                keep = np.zeros(len(self._original_data), dtype=bool)
+                keep[rows] = True
+                order = order[keep[order]]
+            return order
+        # several keys: a lexsort over the cached ranks, mirrored for descending keys
+        positions = np.arange(len(self._original_data)) if rows is None else rows
+        keys = []
+        for column_name, ascending in sort_key:
+            ranks, count = self._sort_rank(column_name)
+            ranks = ranks if rows is None else ranks[rows]
+            keys.append((ranks if ascending else count - 1 - ranks, count))
+        if np.prod([float(count) for _, count in keys]) < 2 ** 63:
+            # the ranks packed into one int64 per row, so the lexsort is a single stable argsort
+            # (about 3x faster than np.lexsort on three keys)
+            packed = np.zeros(len(positions), dtype=np.int64)
+            for ranks, count in keys:
+                packed = packed * count + ranks
+            return positions[np.argsort(packed, kind='stable')]
+        # np.lexsort sorts by its last key first
+        return positions[np.lexsort([ranks for ranks, _ in reversed(keys)])]
+
+    def _position(self, row):
+        return row if self._view is None else self._view[row]
+
+    def is_numeric(self, column):
+        # whether a column's search box takes ranges like >1e8 or 2000..2010
+        return self._index.is_numeric(column)
+
+    def sort_order(self, column):
+        # Qt.SortOrder the column is sorted in, None when it is not a sort key
+        for name, ascending in self._sort_key or ():
+            if name == self._original_data.columns[column]:
+                return Qt.SortOrder.AscendingOrder if ascending else Qt.SortOrder.DescendingOrder
+        return None
+
+    @property
+    def filters(self):
+        # copy of the active search queries, column index -> query
+        return dict(self._filters)
+
+    @property
+    def rows(self):
+        # positions of the filtered rows in the original data, None when nothing is filtered
+        return self._rows
+
+    @property
+    def sort_key(self):
+        # ((column name, ascending), ...) most significant first, None when unsorted
+        return self._sort_key
+
+    def rowCount(self, parent=QModelIndex()):
+        # returns the number of rows
+        return len(self._original_data) if self._view is None else len(self._view)
+
+    def columnCount(self, parent=QModelIndex()):
+        # returns the number of columns
+        return len(self._original_data.columns)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        # retrieving data
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._cells[index.column()][self._position(index.row())]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        # returns headerlabels for columns and rows
+        if role == Qt.ItemDataRole.DisplayRole:
+            if orientation == Qt.Horizontal:
+                return self._column_title(section)
+            else:
+                return self._row_labels[self._position(section)]
+        return None
+
+    def _column_title(self, section):
+        # column name, plus its place and direction while sorting by several columns
+        column_name = self._original_data.columns[section]
+        if self._sort_key is None or len(self._sort_key) < 2:
+            return column_name
+        for place, (name, ascending) in enumerate(self._sort_key, 1):
+            if name == column_name:
+                return f"{column_name} {place}{'▲' if ascending else '▼'}"
+        return column_name
+
+    def sort(self, column, order, append=False):
+        # sort data by columns, only the permutation in _view changes
+        # append=True sorts by column after the current keys (shift-click in the table),
+        # or flips its direction if it is one of them already
+        self.layoutAboutToBeChanged.emit()
+        column_name = self._original_data.columns[column]
+        ascending = order == Qt.SortOrder.AscendingOrder
+        keys = list(self._sort_key or ())
+        if not append:
+            keys = [(column_name, ascending)]
+        elif column_name in dict(keys):
+            keys = [(name, not asc if name == column_name else asc) for name, asc in keys]
+        else:
+            keys.append((column_name, ascending))
+        self._sort_key = tuple(keys)
+        self._view = self._arrange(self._rows, self._sort_key)
+        self.layoutChanged.emit()
+        self.headerDataChanged.emit(Qt.Horizontal, 0, self.columnCount() - 1)
+
+    def find_rows(self, filters, base_filters=None, base_rows=None):
+        # positions of the rows matching every query in filters, None when nothing is filtered
+        # if filters only narrows base_filters (same columns, queries only got longer,
+        # or new columns; see SearchIndex.narrows), the search starts from base_rows
+        # instead of the whole frame
+        # only reads the search index, so it is safe to call off the GUI thread
+        if base_filters is not None and all(col in filters and self._index.narrows(col, q, filters[col]) for col, q in base_filters.items()):
+            rows = base_rows
+            pending = {col: q for col, q in filters.items() if base_filters.get(col) != q}
+        else:
+            rows, pending = None, filters
+        for col, q in pending.items():
+            rows = self._index.search(col, q, rows)
+        return rows
+
+    def build_view(self, filters, base_filters=None, base_rows=None, sort_key=None):
+        # computes everything set_view needs for a filter result without touching the model,
+        # so the expensive part can run on a worker thread
+        rows = self.find_rows(filters, base_filters, base_rows)
+        return rows, self._arrange(rows, sort_key), sort_key
+
+    def set_view(self, filters, view):
+        # swaps in a result from build_view in one layout change
+        rows, order, sort_key = view
+        self.layoutAboutToBeChanged.emit()
+        self._filters = dict(filters)
+        self._rows = rows
+        if sort_key != self._sort_key:
+            # the user sorted again while the result was being computed
+            order = self._arrange(rows, self._sort_key)
+        self._view = order
+        self.layoutChanged.emit()
+
+    def filter(self, column, query):
+        # every search box keeps its own query and the rows shown must match all of them
+        filters = self.filters
+        if query:
+            filters[column] = query
+        else:
+            filters.pop(column, None)
+        self.set_view(filters, self.build_view(filters, self._filters, self._rows, self._sort_key))
+
+class StreamingModel(QAbstractTableModel):
+    # display-only table that grows chunk by chunk while a csv is still being read
+    # rows are appended without touching the ones already shown; the Apps swap in a
+    # PandasModel over the finished frame, which is when sorting and searching start
+    def __init__(self, columns):
+        super().__init__()
+        self._columns = list(columns)
+        self._cells = [[] for _ in self._columns]
+        self._row_labels = []
+
+    def append_rows(self, cells, row_labels):
+        # cells and row labels of the new rows as built by TableData.append()
+        if not row_labels:
+            return
+        first = len(self._row_labels)
+        self.beginInsertRows(QModelIndex(), first, first + len(row_labels) - 1)
+        for column, new_cells in zip(self._cells, cells):
+            column.extend(new_cells)
+        self._row_labels.extend(row_labels)
+        self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return len(self._row_labels)
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self._columns)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._cells[index.column()][index.row()]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole:
+            if orientation == Qt.Horizontal:
+                return self._columns[section]
+            else:
+                return self._row_labels[section]
+        return None
+
+class StoreModel(QAbstractTableModel):
+    # read-only table over a dataset that does not fit in memory, e.g. a mmap_store.ColumnStore
+    # (anything with len(), .columns and .frame(columns, rows) works)
+    # rows are announced batch by batch through canFetchMore/fetchMore as the view scrolls down,
+    # and only the window around the rows being painted is read from the store and turned
+    # into strings, so the model holds a few hundred rows however big the store is
+    FETCH_BATCH = 10_000 # rows announced per fetchMore
+    PREFETCH_ROWS = 100 # rows read before and after the one asked for, so scrolling a page rarely reads again
+
+    def __init__(self, store, columns=None):
+        super().__init__()
+        self._store = store
+        self._columns = list(store.columns if columns is None else columns)
+        self._fetched = min(self.FETCH_BATCH, len(store)) # rows the view knows about so far
+        self._window_start = 0 # store rows [start, start + len(row labels)) are in _cells
+        self._cells = [[] for _ in self._columns]
+        self._row_labels = []
+
+    def _load_window(self, row):
+        start = max(0, row - self.PREFETCH_ROWS)
+        end = min(len(self._store), row + self.PREFETCH_ROWS + 1)
+        frame = self._store.frame(self._columns, rows=np.arange(start, end))
+        self._cells, self._row_labels = stringify(frame)
+        self._window_start = start
+
+    def _cell_row(self, row):
+        # position of a store row in the window, reading a new window when it is outside
+        position = row - self._window_start
+        if not 0 <= position < len(self._row_labels):
+            self._load_window(row)
+            position = row - self._window_start
+        return position
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._fetched < len(self._store)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(self.FETCH_BATCH, len(self._store) - self._fetched)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._fetched, self._fetched + count - 1)
+        self._fetched += count
+        self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._fetched
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self._columns)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and index.isValid():
+            row = self._cell_row(index.row()) # before reading _cells, this may swap in another window
+            return self._cells[index.column()][row]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole:
+            if orientation == Qt.Horizontal:
+                return self._columns[section]
+            else:
+                row = self._cell_row(section)
+                return self._row_labels[row]
+        return None
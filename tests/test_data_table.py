@@ -0,0 +1,91 @@
+import importlib
+import os
+import time
+import pytest
+from PyQt5.QtCore import Qt, QPoint
+from PyQt5.QtTest import QTest
+from conftest import ROOT
+from import_budget import VARIANTS
+
+CSV = os.path.join(ROOT, 'movies.csv')
+
+def wait_until(qapp, condition, timeout=60):
+    start = time.monotonic()
+    while not condition():
+        assert time.monotonic() - start < timeout, 'timed out'
+        qapp.processEvents()
+        time.sleep(0.01)
+
+def open_app(qapp, monkeypatch, variant, csv=CSV):
+    # an App reading the movies.csv next to the code, waited on until its table is built
+    from loader import load_dataset, needed_columns
+    module = importlib.import_module(variant)
+    monkeypatch.setattr(module, 'load_data', lambda on_chunk: load_dataset(csv, on_chunk=on_chunk, columns=needed_columns(module.table_columns)))
+    window = module.App()
+    window.resize(1400, 900)
+    window.show()
+    wait_until(qapp, lambda: getattr(window, 'data_table', None) is not None)
+    qapp.processEvents()
+    return window
+
+def click_header(qapp, window, section):
+    header = window.table_view.horizontalHeader()
+    x = header.sectionViewportPosition(section) + header.sectionSize(section) // 2
+    QTest.mouseClick(header.viewport(), Qt.LeftButton, Qt.NoModifier, QPoint(x, header.height() // 2))
+    qapp.processEvents()
+
+@pytest.mark.parametrize('variant', VARIANTS)
+def test_one_sort_per_header_click(qapp, monkeypatch, variant):
+    window = open_app(qapp, monkeypatch, variant)
+    show_table = window.view_dataframe
+    for _ in range(3):
+        window.name_vs_gross()
+        show_table()
+    model = window.model
+    sorts = []
+    sort = model.sort
+    monkeypatch.setattr(model, 'sort', lambda *args, **kwargs: (sorts.append(args), sort(*args, **kwargs)))
+
+    click_header(qapp, window, 3)
+    assert len(sorts) == 1
+    assert window.table_view.model() is model
+    assert len(window.data_table.search_boxes) == model.columnCount()
+    window.close()
+
+def test_big_csv_is_shown_from_the_store(qapp, monkeypatch, tmp_path):
+    import loader
+    from table_model import StoreModel
+    csv = tmp_path / 'movies.csv'
+    csv.write_bytes(open(CSV, 'rb').read())
+    monkeypatch.setattr(loader, 'STORE_BYTES', 0)
+    window = open_app(qapp, monkeypatch, 'movies', str(csv))
+
+    assert isinstance(window.model, StoreModel)
+    assert window.model.rowCount() == min(StoreModel.FETCH_BATCH, len(window.data))
+    assert window.data_table.search_boxes == []
+    assert not window.selection_button.isEnabled()
+    window.name_vs_gross()
+    window.view_dataframe()
+    click_header(qapp, window, 3) # nothing to sort, nothing breaks
+    assert window.model.data(window.model.index(0, 0)) == window.data['name'].iloc[0]
+
+def test_csv_missing_a_chart_column_only_fails_that_chart(qapp, monkeypatch, tmp_path):
+    import pandas as pd
+    csv = tmp_path / 'movies.csv'
+    pd.read_csv(CSV).drop(columns='rating').to_csv(csv, index=False)
+    window = open_app(qapp, monkeypatch, 'movies', str(csv))
+
+    window.rating_popularity()
+    assert window.charts._message.get_visible()
+    window.genre_vs_freq()
+    assert not window.charts._message.get_visible()
+
+def test_redrawn_chart_keeps_its_colour(qapp, monkeypatch):
+    window = open_app(qapp, monkeypatch, 'movies')
+    window.selection_button.setChecked(True)
+    window.genre_vs_freq()
+    color = window._color
+    for query in ['>=2000', '>=2005', '>=2010']:
+        window.model.filter(3, query)
+        assert window._color == color
+    assert window.selection_aggregates.get('genre').sum() == len(window.model.rows)
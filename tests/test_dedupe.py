@@ -0,0 +1,29 @@
+import os
+import pandas as pd
+from conftest import ROOT
+from dedupe import RowDeduplicator, row_hashes
+from loader import read_chunks
+
+def test_duplicates_across_chunks_match_drop_duplicates(tmp_path):
+    # copies of early rows further down the file, so most duplicates land in a later chunk
+    movies = pd.read_csv(os.path.join(ROOT, 'movies.csv')).iloc[:400]
+    frame = pd.concat([movies, movies.iloc[:60], movies.iloc[150:170], movies.iloc[:5]], ignore_index=True)
+    csv = tmp_path / 'movies.csv'
+    frame.to_csv(csv, index=False)
+    expected = pd.read_csv(csv).drop_duplicates().dropna()
+
+    deduplicator = RowDeduplicator()
+    chunks = [chunk for chunk, _ in read_chunks(str(csv), chunksize=37, first_chunksize=37, deduplicator=deduplicator)]
+
+    assert list(pd.concat(chunks).index) == list(expected.index)
+    assert deduplicator.dropped == pd.read_csv(csv).duplicated().sum() == 85
+
+def test_ints_and_floats_hash_alike():
+    # one missing value turns a chunk's int column into floats, its other rows must still match
+    ints = pd.DataFrame({'name': ['a', 'b'], 'year': [2000, 2001]})
+    floats = pd.DataFrame({'name': ['a', 'b', 'c'], 'year': [2000.0, 2001.0, None]})
+    assert (row_hashes(ints) == row_hashes(floats)[:2]).all()
+    deduplicator = RowDeduplicator()
+    deduplicator.duplicated(ints)
+    assert deduplicator.duplicated(floats).tolist() == [True, True, False]
+    assert deduplicator.dropped == 2 and len(deduplicator) == 3
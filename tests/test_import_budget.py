@@ -0,0 +1,9 @@
+import pytest
+from import_budget import VARIANTS, check
+
+# every App variant must import within import_budget.BUDGET_MS without pulling in
+# pandas, numpy or matplotlib, see import_budget.py
+
+@pytest.mark.parametrize('variant', VARIANTS)
+def test_import_within_budget(variant):
+    assert check(variant, top=0) == []
@@ -0,0 +1,17 @@
+import pandas as pd
+import pytest
+from conftest import ROOT
+from loader import load_movies, needed_columns
+
+@pytest.mark.parametrize('engine', ['c', 'pyarrow'])
+def test_csv_missing_a_chart_column_still_loads(tmp_path, engine):
+    if engine == 'pyarrow':
+        pytest.importorskip('pyarrow')
+    csv = tmp_path / 'movies.csv'
+    pd.read_csv(f'{ROOT}/movies.csv').drop(columns='rating').to_csv(csv, index=False)
+    columns = needed_columns(['name', 'rating', 'year'])
+
+    frame = load_movies(str(csv), use_cache=False, columns=columns, engine=engine)
+
+    assert list(frame.columns) == [name for name in pd.read_csv(csv, nrows=0).columns if name in columns]
+    assert 'rating' not in frame.columns and len(frame) > 5000
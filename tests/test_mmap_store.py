@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+from mmap_store import build_store
+from schema import NUMERIC_DTYPES
+
+def test_later_chunks_do_not_change_column_types(tmp_path):
+    # the first chunk only holds whole numbers; later rows have a fraction in an int column
+    # and text in a numeric one, both are skipped instead of truncated or failing the build
+    csv = tmp_path / 'movies.csv'
+    rows = [f'movie {i},{2000 + i},7.5,{1000 + i}' for i in range(6)]
+    rows += ['fraction,2001.5,7,5', 'text,2002,7,abc', 'last,2003,8.1,99']
+    csv.write_text('\n'.join(['name,year,score,gross'] + rows) + '\n')
+
+    store = build_store(str(csv), str(tmp_path / 'store'), chunksize=3)
+
+    assert len(store) == 7
+    assert store.bad_row_numbers == [7, 8]
+    frame = store.frame()
+    for name in ['year', 'score', 'gross']:
+        assert frame[name].dtype == NUMERIC_DTYPES[name]
+    assert frame['name'].tolist()[-1] == 'last'
+    assert frame['score'].tolist()[-1] == frame['score'].dtype.type(8.1)
+
+def test_categories_and_text_read_back(tmp_path):
+    # categorical columns come back as codes into sorted categories, text decoded in one
+    # piece whether or not it is all ascii, for whole columns and for any rows
+    csv = tmp_path / 'movies.csv'
+    rows = ['Amélie,R,Comedy,France', 'Heat,R,Crime,United States', 'Up,PG,Animation,United States',
+            'Alien,R,Horror,United Kingdom', 'Ran,R,Drama,Japan']
+    csv.write_text('\n'.join(['name,rating,genre,country'] + rows) + '\n', encoding='utf-8')
+    expected = pd.read_csv(csv)
+
+    store = build_store(str(csv), str(tmp_path / 'store'), chunksize=2)
+
+    frame = store.frame()
+    assert isinstance(frame['genre'].dtype, pd.CategoricalDtype)
+    assert list(frame['genre'].cat.categories) == sorted(expected['genre'])
+    for name in expected.columns:
+        assert frame[name].astype(str).tolist() == expected[name].tolist()
+    for rows in ([1, 2, 3], [4, 0, 2], [0]):
+        window = store.frame(rows=np.array(rows))
+        assert window['name'].tolist() == expected['name'].iloc[rows].tolist()
+        assert window['country'].astype(str).tolist() == expected['country'].iloc[rows].tolist()
@@ -0,0 +1,81 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import ROOT
+from loader import load_movies
+from search_index import SearchIndex, parse_range
+
+@pytest.fixture(scope='module')
+def movies():
+    return load_movies(os.path.join(ROOT, 'movies.csv'), use_cache=False)
+
+@pytest.mark.parametrize('query, bounds', [
+    ('>1e8', (1e8, np.inf, False, True)),
+    ('>= 5', (5, np.inf, True, True)),
+    ('<=7.5', (-np.inf, 7.5, True, True)),
+    ('<120', (-np.inf, 120, True, False)),
+    ('=7.3', (7.3, 7.3, True, True)),
+    ('19', (19, 19, True, True)),
+    ('2000..2010', (2000, 2010, True, True)),
+    ('2000..', (2000, np.inf, True, True)),
+    ('..1990', (-np.inf, 1990, True, True)),
+])
+def test_parse_range(query, bounds):
+    assert parse_range(query) == bounds
+
+@pytest.mark.parametrize('query', ['', '..', 'abc', '1e', '> x', '19 20', '1..2..3'])
+def test_not_a_range(query):
+    assert parse_range(query) is None
+
+def brute_force(values, query):
+    low, high, low_inclusive, high_inclusive = parse_range(query)
+    values = values.to_numpy()
+    if np.issubdtype(values.dtype, np.floating):
+        low, high = values.dtype.type(low), values.dtype.type(high)
+    above = values >= low if low_inclusive else values > low
+    below = values <= high if high_inclusive else values < high
+    return np.flatnonzero(above & below)
+
+@pytest.mark.parametrize('name, query', [
+    ('gross', '>1e8'),
+    ('year', '2000..2010'),
+    ('year', '..1990'),
+    ('score', '<=7.5'),
+    ('score', '=7.3'), # float32 column, compared in its own precision
+    ('runtime', '19'), # int16, a bare number is that value, not a substring
+    ('runtime', '>=1e9'), # past the end of int16
+    ('year', '<-1e9'),
+    ('year', '2010..2000'),
+    ('votes', '>-1e30'),
+    ('budget', '>2.5e7'),
+])
+def test_range_matches_brute_force(movies, name, query):
+    index = SearchIndex(movies)
+    column = movies.columns.get_loc(name)
+    assert index.is_numeric(column)
+    expected = brute_force(movies[name], query)
+    assert np.array_equal(index.search(column, query), expected)
+    rows = np.arange(0, len(movies), 3)
+    assert np.array_equal(index.search(column, query, rows), np.intersect1d(expected, rows))
+
+def test_equal_finds_float32_value(movies):
+    index = SearchIndex(movies)
+    column = movies.columns.get_loc('score')
+    found = index.search(column, '=7.3')
+    assert len(found) and (movies['score'].iloc[found] == np.float32(7.3)).all()
+
+def test_bare_number_on_text_column_is_a_substring(movies):
+    index = SearchIndex(movies)
+    column = movies.columns.get_loc('released')
+    found = index.search(column, '19')
+    assert np.array_equal(found, np.flatnonzero(movies['released'].str.contains('19', regex=False).to_numpy()))
+
+def test_narrows():
+    index = SearchIndex(pd.DataFrame({'name': ['a'], 'year': [2000]}))
+    assert index.narrows(0, 'ab', 'abc')
+    assert not index.narrows(0, 'abc', 'ab')
+    # "<1" then "<10" looks like a longer query but widens the range
+    assert not index.narrows(1, '<1', '<10')
+    assert not index.narrows(1, '1', '10')
+    assert index.narrows(1, '<1', '<1')
@@ -0,0 +1,75 @@
+import os
+import random
+import numpy as np
+import pytest
+from PyQt5.QtCore import Qt
+from conftest import ROOT
+from loader import load_movies
+from loader import read_chunks
+from table_model import PandasModel, TableData, stringify
+
+ASCENDING, DESCENDING = Qt.SortOrder.AscendingOrder, Qt.SortOrder.DescendingOrder
+
+@pytest.fixture(scope='module')
+def movies():
+    return load_movies(os.path.join(ROOT, 'movies.csv'), use_cache=False)
+
+def shown(model):
+    # row labels in the order the table shows them
+    return [model.headerData(row, Qt.Vertical) for row in range(model.rowCount())]
+
+def expected(frame, sort_key):
+    names = [name for name, _ in sort_key]
+    ascending = [asc for _, asc in sort_key]
+    return [str(label) for label in frame.sort_values(names, ascending=ascending, kind='stable').index]
+
+def test_shift_click_adds_and_flips_keys(qapp, movies):
+    model = PandasModel(movies)
+    year, gross = movies.columns.get_loc('year'), movies.columns.get_loc('gross')
+    model.sort(year, ASCENDING)
+    model.sort(gross, DESCENDING, append=True)
+    assert model.sort_key == (('year', True), ('gross', False))
+    assert shown(model) == expected(movies, model.sort_key)
+    # shift-clicking a key again flips it whatever order the header asked for
+    model.sort(year, ASCENDING, append=True)
+    assert model.sort_key == (('year', False), ('gross', False))
+    assert model.sort_order(year) == DESCENDING
+    assert shown(model) == expected(movies, model.sort_key)
+    # a plain click starts over with one key
+    model.sort(gross, ASCENDING)
+    assert model.sort_key == (('gross', True),)
+
+def test_many_keys_fall_back_to_lexsort(qapp, movies):
+    # more distinct values than an int64 can pack, so _arrange uses np.lexsort
+    model = PandasModel(movies)
+    names = ['name', 'released', 'votes', 'budget', 'gross', 'runtime', 'year']
+    assert np.prod([float(model._sort_rank(name)[1]) for name in names]) >= 2 ** 63
+    for i, name in enumerate(names):
+        model.sort(movies.columns.get_loc(name), DESCENDING if i % 2 else ASCENDING, append=i > 0)
+    assert shown(model) == expected(movies, model.sort_key)
+
+@pytest.mark.parametrize('seed', range(5))
+def test_random_clicks_match_sort_values(qapp, movies, seed):
+    rng = random.Random(seed)
+    model = PandasModel(movies)
+    columns = ['year', 'genre', 'score', 'rating', 'country', 'gross', 'runtime']
+    queries = {'year': '>=2000', 'genre': 'dr', 'score': '6..8', 'rating': 'pg'}
+    for _ in range(12):
+        name = rng.choice(columns)
+        model.sort(movies.columns.get_loc(name), rng.choice([ASCENDING, DESCENDING]), append=rng.random() < 0.6)
+        if rng.random() < 0.3:
+            column = rng.choice(list(queries))
+            model.filter(movies.columns.get_loc(column), queries[column] if rng.random() < 0.7 else '')
+        frame = movies if model.rows is None else movies.iloc[model.rows]
+        assert shown(model) == expected(frame, model.sort_key)
+
+def test_streamed_strings_are_reused(qapp, movies):
+    # the strings built chunk by chunk while loading are the ones a fresh model would build
+    table = TableData()
+    chunks = [chunk for chunk, _ in read_chunks(os.path.join(ROOT, 'movies.csv'), chunksize=1000)]
+    for chunk in chunks:
+        table.append(chunk)
+    cells = table.cells
+    model = PandasModel(movies, table.finish(movies))
+    assert model._cells is cells
+    assert (cells, table.row_labels) == stringify(movies)